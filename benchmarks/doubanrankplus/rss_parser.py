@@ -0,0 +1,170 @@
+"""
+豆瓣榜单RSS解析基准测试
+
+对比原 minidom 整文档解析与插件当前的流式解析（__iter_rss_info），
+使用同目录下 250 条目的 top250.xml 作为夹具，输出耗时、峰值内存和
+产出第一条目的耗时，并校验两者解析结果一致。
+
+需要在 MoviePilot 环境中运行（插件依赖 app.*）：
+
+    PYTHONPATH=/path/to/MoviePilot python benchmarks/doubanrankplus/rss_parser.py
+"""
+
+import importlib.util
+import re
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Iterable, List, Optional
+from xml.dom.minidom import parseString
+
+from app.utils.dom import DomUtils
+
+BENCH_DIR = Path(__file__).resolve().parent
+PLUGIN_FILE = (
+    BENCH_DIR.parents[1] / "plugins.v2" / "doubanrankplus" / "__init__.py"
+)
+FIXTURE = BENCH_DIR / "top250.xml"
+
+# 只比较原解析器也会产出的字段，流式解析额外提取的评分不参与比较
+COMPARE_FIELDS = ("title", "link", "mtype", "year", "doubanid")
+
+
+def load_plugin():
+    """
+    按文件路径加载插件模块
+    """
+    spec = importlib.util.spec_from_file_location(
+        "app.plugins.doubanrankplus", PLUGIN_FILE
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def minidom_rss_info(ret_xml: str) -> List[dict]:
+    """
+    原实现：整文档解析为DOM后遍历item
+    """
+    ret_array: List[dict] = []
+    dom_tree = parseString(ret_xml)
+    rootNode = dom_tree.documentElement
+    if rootNode is None:
+        return []
+    items = rootNode.getElementsByTagName("item")
+    for item in items:
+        try:
+            # 标题
+            title = DomUtils.tag_value(item, "title", default="")
+            # 链接
+            link = DomUtils.tag_value(item, "link", default="")
+            if not title and not link:
+                continue
+
+            # 豆瓣ID
+            found_doubanid = re.findall(r"/(\d+)/", str(link) or "")
+            if found_doubanid:
+                doubanid = found_doubanid[0]
+                if not str(doubanid).isdigit():
+                    continue
+            else:
+                doubanid = None
+
+            # 年份
+            year = DomUtils.tag_value(item, "year", default="")
+            if not year:
+                description = DomUtils.tag_value(
+                    item, "description", default=""
+                )
+                # 删除 '评价数' 到第一个 '<br>' 之间的字符串
+                description = re.sub(
+                    r"评价数.*?<br>", "", str(description) or ""
+                )
+                # 删除所有 <img> 标签及其内容
+                description = re.sub(r"<img.*?>", "", description)
+                # 匹配4位独立数字1900-2099年
+                found_year = re.findall(r"\b(19\d{2}|20\d{2})\b", description)
+                year = found_year[0] if found_year else None
+
+            # 类型
+            mtype = DomUtils.tag_value(item, "type", default="")
+
+            ret_array.append(
+                {
+                    "title": str(title),
+                    "link": str(link),
+                    "mtype": str(mtype),
+                    "year": str(year) if year else None,
+                    "doubanid": str(doubanid) if doubanid else None,
+                }
+            )
+        except Exception:
+            continue
+    return ret_array
+
+
+def first_item_seconds(parse, content) -> Optional[float]:
+    """
+    产出第一条目的耗时
+    """
+    start = timeit.default_timer()
+    for _ in parse(content):
+        return timeit.default_timer() - start
+    return None
+
+
+def peak_memory(parse, content) -> int:
+    tracemalloc.start()
+    try:
+        list(parse(content))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def project(rss_infos: Iterable[dict]) -> List[tuple]:
+    return [
+        tuple(info.get(field) for field in COMPARE_FIELDS)
+        for info in rss_infos
+    ]
+
+
+def main(number: int = 50):
+    content = FIXTURE.read_bytes()
+    text = content.decode("utf-8")
+    plugin = load_plugin()
+    stream_parse = plugin.DoubanRankPlus._DoubanRankPlus__iter_rss_info
+
+    baseline = minidom_rss_info(text)
+    streamed = list(stream_parse([content]))
+    if project(baseline) != project(streamed):
+        raise SystemExit("解析结果不一致")
+
+    print(
+        f"夹具：{FIXTURE.name}，{len(content) // 1024} KiB，"
+        f"{len(baseline)} 个条目"
+    )
+    cases = (
+        ("minidom", lambda: minidom_rss_info(text), minidom_rss_info, text),
+        (
+            "stream",
+            lambda: list(stream_parse([content])),
+            stream_parse,
+            [content],
+        ),
+    )
+    for name, run, parse, arg in cases:
+        seconds = min(timeit.repeat(run, number=number, repeat=5)) / number
+        first = first_item_seconds(lambda c: iter(parse(c)), arg)
+        peak = peak_memory(parse, arg)
+        print(
+            f"{name:8s} 解析 {seconds * 1000:.2f} ms，"
+            f"首条目 {first * 1000:.2f} ms，"
+            f"峰值内存 {peak / 1024:.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
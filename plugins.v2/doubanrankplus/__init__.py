@@ -1,31 +1,63 @@
+import bisect
 import datetime
+import csv
+import hashlib
+import json
+import mmap
+import os
 import re
-import xml.dom.minidom
-from threading import Event
-from typing import Optional, Tuple, List, Dict, Any, TypedDict
+import struct
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from queue import Queue
+from threading import Event, Lock, RLock, Semaphore
+from urllib.parse import urlparse
+from typing import (
+    Optional,
+    Tuple,
+    List,
+    Dict,
+    Any,
+    TypedDict,
+    Iterable,
+    Iterator,
+    NotRequired,
+)
 import time
-import random
 import pytz
 import requests
+from requests.adapters import HTTPAdapter
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from enum import Enum
+from pathlib import Path
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser
 
 from app.schemas import Response
 from app.schemas.types import MediaType
 from app.core.context import MediaInfo
 from app.core.meta.metabase import MetaBase
 from app.chain.download import DownloadChain
+from app.chain.mediaserver import MediaServerChain
 from app.chain.media import MediaChain
 from app.chain.subscribe import SubscribeChain
+from app.db.subscribe_oper import SubscribeOper
+from app.helper.mediaserver import MediaServerHelper
 from app.core.config import settings
 from app.core.metainfo import MetaInfo
 from app.log import logger
 from app.plugins import _PluginBase
-from app.utils.dom import DomUtils
 from app.utils.http import RequestUtils
 from app.modules.douban.apiv2 import DoubanApi
 
+# RSS条目解析
+RE_DOUBANID = re.compile(r"/(\d+)/")
+RE_DESCRIPTION_RATING_COUNT = re.compile(r"评价数.*?<br>")
+RE_DESCRIPTION_RATING = re.compile(r"评分[：:]\s*(\d+(?:\.\d+)?)")
+RE_DESCRIPTION_IMG = re.compile(r"<img.*?>")
+RE_YEAR = re.compile(r"\b(19\d{2}|20\d{2})\b")
+RE_WHITESPACE = re.compile(r"\s+")
+
 
 class Status(Enum):
     UNRECOGNIZED = "未识别"
@@ -50,6 +82,7 @@ class Icons(Enum):
     STATISTICS = "icon_statistics"
     UNRECOGNIZED = "icon_unrecognized"
     RSS = "icon_rss"
+    DEFERRED = "icon_deferred"
 
 
 class HistoryPayload(TypedDict):
@@ -65,6 +98,9 @@ class HistoryPayload(TypedDict):
     time_full: str
     vote: float
     status: str
+    # 未识别记录的识别次数和下次重试时间
+    attempts: NotRequired[int]
+    next_retry: NotRequired[str]
 
 
 class RssInfo(TypedDict):
@@ -73,6 +109,898 @@ class RssInfo(TypedDict):
     mtype: str
     doubanid: str | None
     year: str | None
+    # 榜单描述中的豆瓣评分
+    rating: float | None
+
+
+class FeedCache(TypedDict):
+    etag: str | None
+    last_modified: str | None
+    rss_infos: List[RssInfo]
+    time_full: str
+
+
+class FeedFingerprint(TypedDict):
+    # 所有条目摘要排序后的摘要
+    fingerprint: str
+    # 各条目摘要
+    items: List[str]
+    # 榜单中未识别条目最早的重试时间
+    next_retry: str | None
+
+
+class RateLimiterState(TypedDict):
+    interval: float
+    time_full: str
+
+
+class DoubanRateLimiter:
+    """
+    豆瓣请求自适应令牌桶限速
+    请求成功时线性提高速率，触发IP速率限制时速率减半（AIMD）
+    """
+
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        capacity: float = 2.0,
+        increase_step: float = 0.02,
+        decrease_factor: float = 0.5,
+    ):
+        """
+        :param min_interval:    最小请求间隔（秒）
+        :param max_interval:    最大请求间隔（秒）
+        :param capacity:        令牌桶容量，允许的突发请求数
+        :param increase_step:   每次请求成功增加的速率（次/秒）
+        :param decrease_factor: 触发限制时速率的缩减系数
+        """
+        self._lock = Lock()
+        self.min_interval = max(float(min_interval), 0.0)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.capacity = capacity
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        # 冷启动时使用最慢速率
+        self.interval = self.max_interval
+        self._tokens = 0.0
+        self._last_refill = time.monotonic()
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        if self.interval <= 0:
+            self._tokens = self.capacity
+        else:
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._last_refill) / self.interval,
+            )
+        self._last_refill = now
+
+    def acquire(self, event: Event | None = None) -> bool:
+        """
+        获取一个令牌，令牌不足时等待
+        :param event: 退出事件，等待期间被设置则放弃获取
+        :return: 是否获取到令牌
+        """
+        while True:
+            with self._lock:
+                self.__refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_time = (1 - self._tokens) * self.interval
+            if event:
+                if event.wait(wait_time):
+                    return False
+            else:
+                time.sleep(wait_time)
+
+    def on_success(self) -> None:
+        """
+        请求成功，线性提速
+        """
+        with self._lock:
+            if self.interval <= self.min_interval:
+                return
+            rate = 1 / self.interval + self.increase_step
+            self.interval = max(self.min_interval, 1 / rate)
+
+    def on_rate_limit(self) -> None:
+        """
+        触发IP速率限制，成倍降速并清空令牌
+        """
+        with self._lock:
+            self.interval = min(
+                self.max_interval,
+                max(self.interval, self.min_interval, 0.1)
+                / self.decrease_factor,
+            )
+            self._tokens = 0.0
+            self._last_refill = time.monotonic()
+
+    def get_state(self) -> RateLimiterState:
+        with self._lock:
+            return {
+                "interval": round(self.interval, 3),
+                "time_full": datetime.datetime.now(
+                    tz=pytz.timezone(settings.TZ)
+                ).strftime("%Y-%m-%d %H:%M:%S"),
+            }
+
+    def set_state(self, state: RateLimiterState | None) -> None:
+        if not state or state.get("interval") is None:
+            return
+        with self._lock:
+            self.interval = min(
+                self.max_interval,
+                max(self.min_interval, float(state.get("interval", 0))),
+            )
+
+
+class DoubanBudgetExceeded(Exception):
+    """
+    本次运行的豆瓣请求次数已用完
+    """
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreakerState(TypedDict):
+    state: str
+    opened_at: float
+    open_seconds: float
+    trip_times: int
+
+
+class DoubanCircuitBreaker:
+    """
+    豆瓣IP速率限制熔断器
+    触发限制后熔断，熔断期间不请求豆瓣；熔断时间结束后进入半开状态，只放行一个探测请求，
+    探测成功后恢复，再次触发限制则熔断时间加倍
+    """
+
+    def __init__(
+        self,
+        base_open_seconds: float = 4200,
+        max_open_seconds: float = 86400,
+        factor: float = 2.0,
+    ):
+        """
+        :param base_open_seconds: 首次熔断时间（秒）
+        :param max_open_seconds:  最长熔断时间（秒）
+        :param factor:            连续触发限制时熔断时间的倍数
+        """
+        self._lock = Lock()
+        self.base_open_seconds = base_open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.factor = factor
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self.open_seconds = 0.0
+        # 连续触发限制的次数，探测成功后清零
+        self.trip_times = 0
+        self._probing = False
+
+    @property
+    def open_until(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(
+            self.opened_at + self.open_seconds, tz=pytz.timezone(settings.TZ)
+        )
+
+    def __is_open_expired(self) -> bool:
+        return time.time() >= self.opened_at + self.open_seconds
+
+    def is_available(self) -> bool:
+        """
+        是否可以请求豆瓣，不占用探测请求
+        """
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.OPEN:
+                return self.__is_open_expired()
+            return not self._probing
+
+    def allow_request(self) -> Tuple[bool, bool]:
+        """
+        请求豆瓣前调用，半开状态下只放行一个探测请求
+        :return: 是否放行，是否为探测请求；只有探测请求可以调用 on_success 和 release
+        """
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True, False
+            if self.state == CircuitState.OPEN:
+                if not self.__is_open_expired():
+                    return False, False
+                self.state = CircuitState.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False, False
+            self._probing = True
+            logger.info("豆瓣熔断时间已过，发送探测请求")
+            return True, True
+
+    def release(self) -> None:
+        """
+        探测请求结束后调用，未成功（出错或中断）时下次重新探测
+        """
+        with self._lock:
+            self._probing = False
+
+    def on_success(self) -> None:
+        """
+        探测请求成功后调用，解除熔断
+        """
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN and self._probing:
+                logger.info(
+                    f"豆瓣探测请求成功，解除熔断, 已连续触发次数: {self.trip_times}"
+                )
+                self.state = CircuitState.CLOSED
+                self.trip_times = 0
+                self._probing = False
+
+    def on_rate_limit(self) -> None:
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                # 熔断前已发出的请求
+                return
+            self.trip_times += 1
+            self.state = CircuitState.OPEN
+            self.opened_at = time.time()
+            self.open_seconds = min(
+                self.max_open_seconds,
+                self.base_open_seconds * self.factor ** (self.trip_times - 1),
+            )
+            self._probing = False
+
+    def get_state(self) -> CircuitBreakerState:
+        with self._lock:
+            return {
+                "state": self.state.value,
+                "opened_at": self.opened_at,
+                "open_seconds": self.open_seconds,
+                "trip_times": self.trip_times,
+            }
+
+    def set_state(self, state: CircuitBreakerState | None) -> None:
+        if not state or not state.get("state"):
+            return
+        with self._lock:
+            self.state = CircuitState(state.get("state"))
+            # 中断时未完成的探测请求不再等待结果
+            if self.state == CircuitState.HALF_OPEN:
+                self.state = CircuitState.OPEN
+            self.opened_at = float(state.get("opened_at") or 0)
+            self.open_seconds = float(state.get("open_seconds") or 0)
+            self.trip_times = int(state.get("trip_times") or 0)
+            self._probing = False
+
+
+class ExpiringLRUCache:
+    """
+    带过期时间和LRU淘汰的缓存，可序列化后保存到插件数据
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        """
+        :param ttl:      过期时间（秒），小于等于0时不缓存
+        :param max_size: 最大条目数，超出时淘汰最久未使用的条目
+        """
+        self._lock = Lock()
+        self._entries: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry.get("time", 0) > self.ttl:
+                del self._entries[key]
+                self.dirty = True
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.get("value")
+
+    def set(self, key: str, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = {"value": value, "time": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self.dirty = True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return False
+            self.dirty = True
+            return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出未过期的条目，按使用时间从旧到新排列
+        """
+        with self._lock:
+            now = time.time()
+            self.dirty = False
+            return {
+                key: entry
+                for key, entry in self._entries.items()
+                if now - entry.get("time", 0) <= self.ttl
+            }
+
+    def load(self, data: Dict[str, Any] | None) -> None:
+        if not data or not isinstance(data, dict):
+            return
+        with self._lock:
+            for key, entry in data.items():
+                if isinstance(entry, dict) and "value" in entry:
+                    self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class DoubanTmdbMapping:
+    """
+    离线豆瓣ID到TMDBID映射
+    按豆瓣ID升序保存为定长记录的二进制文件，内存映射后二分查找，加载时无需读取整个文件
+    """
+
+    # 豆瓣ID, TMDBID, 类型
+    RECORD = struct.Struct("<QIB")
+    MAGIC = b"DRPMAP01"
+    MEDIA_TYPES = {1: MediaType.MOVIE, 2: MediaType.TV}
+    # 记录可保存的最大豆瓣ID和TMDBID
+    MAX_DOUBANID = 2**64 - 1
+    MAX_TMDBID = 2**32 - 1
+
+    class _Keys:
+        """
+        按序号读取豆瓣ID，供 bisect 使用
+        """
+
+        def __init__(self, mapping: "DoubanTmdbMapping"):
+            self._mapping = mapping
+
+        def __len__(self) -> int:
+            return len(self._mapping)
+
+        def __getitem__(self, index: int) -> int:
+            return self._mapping.RECORD.unpack_from(
+                self._mapping._buffer,
+                len(self._mapping.MAGIC) + index * self._mapping.RECORD.size,
+            )[0]
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._buffer: mmap.mmap | None = None
+        self._count = 0
+        # 关闭时等待正在进行的查询
+        self._lock = Lock()
+        if not path.exists():
+            return
+        with path.open("rb") as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # 空文件
+                return
+        if buffer[: len(self.MAGIC)] != self.MAGIC:
+            logger.error(f"豆瓣ID映射文件格式错误：{path}")
+            buffer.close()
+            return
+        self._buffer = buffer
+        self._count = (len(buffer) - len(self.MAGIC)) // self.RECORD.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, doubanid: str) -> Tuple[int, MediaType | None] | None:
+        """
+        查找豆瓣ID对应的TMDBID和类型
+        """
+        if not str(doubanid).isdigit():
+            return None
+        key = int(doubanid)
+        with self._lock:
+            if not self._buffer:
+                return None
+            index = bisect.bisect_left(self._Keys(self), key)
+            if index >= self._count:
+                return None
+            found_doubanid, tmdbid, mtype = self.RECORD.unpack_from(
+                self._buffer, len(self.MAGIC) + index * self.RECORD.size
+            )
+        if found_doubanid != key:
+            return None
+        return tmdbid, self.MEDIA_TYPES.get(mtype)
+
+    def close(self):
+        """
+        关闭内存映射，关闭后查询均返回空
+        """
+        with self._lock:
+            if self._buffer:
+                self._buffer.close()
+            self._buffer = None
+            self._count = 0
+
+    @classmethod
+    def is_valid(cls, doubanid: int, tmdbid: int) -> bool:
+        """
+        ID是否可以保存到映射文件
+        """
+        return (
+            0 < doubanid <= cls.MAX_DOUBANID and 0 < tmdbid <= cls.MAX_TMDBID
+        )
+
+    @classmethod
+    def build(
+        cls, path: Path, rows: Iterable[Tuple[int, int, MediaType | None]]
+    ) -> int:
+        """
+        生成映射文件，同一豆瓣ID出现多次时使用最后一条
+        :param rows: (豆瓣ID, TMDBID, 类型)
+        :return: 记录数
+        """
+        type_codes = {mtype: code for code, mtype in cls.MEDIA_TYPES.items()}
+        records: Dict[int, Tuple[int, int]] = {}
+        for doubanid, tmdbid, mtype in rows:
+            if not cls.is_valid(doubanid, tmdbid):
+                continue
+            records[doubanid] = (tmdbid, type_codes.get(mtype, 0))
+
+        # 写入临时文件后替换，已映射的旧文件不受影响
+        tmp_path = path.with_suffix(".tmp")
+        with tmp_path.open("wb") as f:
+            f.write(cls.MAGIC)
+            for doubanid in sorted(records):
+                tmdbid, type_code = records[doubanid]
+                f.write(cls.RECORD.pack(doubanid, tmdbid, type_code))
+        os.replace(tmp_path, path)
+        return len(records)
+
+
+class FeedOption(TypedDict):
+    addr: str
+    customize_save_paths: Dict[str, str] | None
+    subscription_type: str | None
+
+
+class WorkItem(TypedDict):
+    # 在本次计划中的序号，按优先级排列
+    index: int
+    key: str
+    rss_info: RssInfo
+    unique_flags: List[str]
+    options: List[FeedOption]
+    # 在各榜单中的相对位置，0为榜首
+    rank_ratios: List[float]
+    priority: float
+
+
+class RunCheckpoint(TypedDict):
+    # 计划签名，榜单条目变化后检查点失效
+    signature: str
+    # 此序号之前的条目均已处理
+    watermark: int
+    limiter: RateLimiterState
+    douban_breaker: CircuitBreakerState
+    time_full: str
+
+
+class PlanWatermark:
+    """
+    计划处理进度
+    条目并行处理、完成顺序不定，水位为第一个未完成条目的序号
+    """
+
+    def __init__(self, finished: Iterable[int] = (), watermark: int = 0):
+        self._lock = Lock()
+        self._finished = set(finished)
+        self.value = watermark
+        self.__advance()
+
+    def __advance(self) -> None:
+        while self.value in self._finished:
+            self._finished.discard(self.value)
+            self.value += 1
+
+    def finish(self, index: int) -> None:
+        with self._lock:
+            if index >= self.value:
+                self._finished.add(index)
+                self.__advance()
+
+
+class RecognizedItem(TypedDict):
+    work_item: WorkItem
+    meta: MetaBase
+    mediainfo: MediaInfo
+
+
+class HistoryJournal:
+    """
+    历史记录追加日志
+    新记录按行追加写入文件，定期合并到插件数据中的完整历史后清空
+    """
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._lock = Lock()
+
+    def append(self, records: List[HistoryPayload]) -> None:
+        if not records:
+            return
+        with self._lock:
+            with self._path.open("a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def read(self) -> List[HistoryPayload]:
+        with self._lock:
+            if not self._path.exists():
+                return []
+            records: List[HistoryPayload] = []
+            with self._path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # 忽略中断写入的行
+                        continue
+            return records
+
+    def size(self) -> int:
+        with self._lock:
+            if not self._path.exists():
+                return 0
+            with self._path.open("r", encoding="utf-8") as f:
+                return sum(1 for _ in f)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._path.unlink(missing_ok=True)
+
+
+class HistoryStore:
+    """
+    历史记录索引
+    按 unique 索引记录，并维护按状态和按时间排序的二级索引
+    """
+
+    def __init__(self, records: Iterable[HistoryPayload] = ()):
+        self._lock = RLock()
+        self._records: Dict[str, HistoryPayload] = {}
+        self._status_index: Dict[str, set[str]] = {}
+        # 按 (time_full, unique) 升序排列
+        self._time_index: List[Tuple[str, str]] = []
+        # 每次变更后递增，用于判断缓存是否过期
+        self.version = 0
+        for record in records:
+            if record:
+                self.add(record)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, unique: object) -> bool:
+        return unique in self._records
+
+    @staticmethod
+    def __time_key(record: HistoryPayload) -> Tuple[str, str]:
+        return str(record.get("time_full") or ""), str(record.get("unique"))
+
+    def get(self, unique: str) -> HistoryPayload | None:
+        return self._records.get(unique)
+
+    def add(self, record: HistoryPayload) -> None:
+        """
+        添加记录，unique 已存在时替换
+        """
+        with self._lock:
+            unique = str(record.get("unique"))
+            if unique in self._records:
+                self.delete(unique)
+            self._records[unique] = record
+            self._status_index.setdefault(
+                str(record.get("status")), set()
+            ).add(unique)
+            bisect.insort(self._time_index, self.__time_key(record))
+            self.version += 1
+
+    def delete(self, unique: str) -> HistoryPayload | None:
+        with self._lock:
+            record = self._records.pop(unique, None)
+            if record is None:
+                return None
+            self._status_index.get(str(record.get("status")), set()).discard(
+                unique
+            )
+            time_key = self.__time_key(record)
+            index = bisect.bisect_left(self._time_index, time_key)
+            if (
+                index < len(self._time_index)
+                and self._time_index[index] == time_key
+            ):
+                del self._time_index[index]
+            self.version += 1
+            return record
+
+    def delete_status(self, status: str) -> int:
+        """
+        删除指定状态的所有记录
+        :return: 删除的数量
+        """
+        with self._lock:
+            uniques = list(self._status_index.get(status, set()))
+            for unique in uniques:
+                self.delete(unique)
+            return len(uniques)
+
+    def count(self, status: str | None = None) -> int:
+        if status is None:
+            return len(self._records)
+        return len(self._status_index.get(status, set()))
+
+    def latest(
+        self,
+        limit: int | None = None,
+        status: str | None = None,
+        exclude_status: str | None = None,
+    ) -> List[HistoryPayload]:
+        """
+        按时间降序获取记录
+        :param limit:          最大数量
+        :param status:         只获取该状态的记录
+        :param exclude_status: 排除该状态的记录
+        """
+        records: List[HistoryPayload] = []
+        with self._lock:
+            for _time_full, unique in reversed(self._time_index):
+                if limit is not None and len(records) >= limit:
+                    break
+                record = self._records[unique]
+                if status is not None and record.get("status") != status:
+                    continue
+                if (
+                    exclude_status is not None
+                    and record.get("status") == exclude_status
+                ):
+                    continue
+                records.append(record)
+        return records
+
+    def page(
+        self,
+        cursor: Tuple[str, str] | None = None,
+        limit: int = 50,
+        status: str | None = None,
+        mtype: str | None = None,
+        year: str | None = None,
+    ) -> Tuple[List[HistoryPayload], Tuple[str, str] | None]:
+        """
+        按时间降序分页获取记录
+        :param cursor: 上一页最后一条记录的 (time_full, unique)，为空时从最新开始
+        :param limit:  每页数量
+        :param status: 只获取该状态的记录
+        :param mtype:  只获取该类型的记录
+        :param year:   只获取该年份的记录
+        :return: 记录列表，下一页游标（没有更多记录时为 None）
+        """
+        records: List[HistoryPayload] = []
+        with self._lock:
+            end = (
+                bisect.bisect_left(self._time_index, cursor)
+                if cursor
+                else len(self._time_index)
+            )
+            for index in range(end - 1, -1, -1):
+                time_key = self._time_index[index]
+                record = self._records[time_key[1]]
+                if status and record.get("status") != status:
+                    continue
+                if mtype and record.get("type") != mtype:
+                    continue
+                if year and str(record.get("year")) != year:
+                    continue
+                if len(records) >= limit:
+                    return records, self.__time_key(records[-1])
+                records.append(record)
+        return records, None
+
+    def records(self) -> List[HistoryPayload]:
+        """
+        按时间升序获取所有记录
+        """
+        with self._lock:
+            return [self._records[unique] for _, unique in self._time_index]
+
+
+class SubscriptionIndex:
+    """
+    订阅索引
+    运行开始时一次性加载所有订阅，判断规则与 SubscribeChain.exists 一致：
+    有TMDBID时按TMDBID和季判断，未指定季时任一季已订阅即存在；否则按豆瓣ID判断
+    """
+
+    def __init__(self, subscribes: Iterable[Any] = ()):
+        self._lock = Lock()
+        self._tmdb_seasons: Dict[int, set[int | None]] = {}
+        self._doubanids: set[str] = set()
+        for subscribe in subscribes:
+            self.add(
+                tmdbid=subscribe.tmdbid,
+                doubanid=subscribe.doubanid,
+                season=subscribe.season,
+            )
+
+    def add(
+        self,
+        tmdbid: int | None,
+        doubanid: str | None = None,
+        season: int | None = None,
+    ) -> None:
+        with self._lock:
+            if tmdbid:
+                self._tmdb_seasons.setdefault(int(tmdbid), set()).add(season)
+            if doubanid:
+                self._doubanids.add(str(doubanid))
+
+    def exists(
+        self,
+        tmdbid: int | None,
+        doubanid: str | None = None,
+        season: int | None = None,
+    ) -> bool:
+        with self._lock:
+            if tmdbid:
+                seasons = self._tmdb_seasons.get(int(tmdbid))
+                if seasons is None:
+                    return False
+                return season in seasons if season else True
+            if doubanid:
+                return str(doubanid) in self._doubanids
+            return False
+
+
+class LibrarySnapshot:
+    """
+    媒体库快照
+    运行开始后一次性获取所有媒体服务器的媒体库条目，按 (TMDBID, 类型) 索引，
+    剧集的季集信息在首次查询时获取
+    """
+
+    def __init__(self, mschain: MediaServerChain, servers: Iterable[str]):
+        self._mschain = mschain
+        self._lock = Lock()
+        # {(TMDBID, 类型): [(媒体服务器, 条目ID)]}
+        self._items: Dict[Tuple[int, str], List[Tuple[str, str]]] = {}
+        # 没有TMDBID的条目标题，媒体服务器可能按标题匹配，需要实时查询
+        self._untagged_titles: set[str] = set()
+        # {(TMDBID, 类型): {季: {集}}}
+        self._seasons: Dict[Tuple[int, str], Dict[int, set[int]]] = {}
+        # 所有媒体服务器都获取成功时，未命中的条目才能判断为不存在
+        self.complete = True
+        self.item_count = 0
+        for server in servers:
+            try:
+                self.__load_server(server)
+            except Exception as e:
+                self.complete = False
+                logger.error(f"获取媒体服务器 {server} 的媒体库出错: {str(e)}")
+
+    @staticmethod
+    def __normalize_title(title: str | None) -> str:
+        return RE_WHITESPACE.sub("", title or "").lower()
+
+    @staticmethod
+    def __item_type(item_type: str | None) -> str | None:
+        """
+        媒体库条目类型，合集、文件夹等其他类型的条目返回None
+        """
+        if item_type in ["Series", "show"]:
+            return MediaType.TV.value
+        if item_type in ["Movie", "movie"]:
+            return MediaType.MOVIE.value
+        return None
+
+    def __load_server(self, server: str) -> None:
+        for library in self._mschain.librarys(server) or []:
+            if not library.id:
+                continue
+            for item in self._mschain.items(server, library.id) or []:
+                if not item or not item.item_id:
+                    continue
+                item_type = self.__item_type(item.item_type)
+                if not item_type:
+                    continue
+                self.item_count += 1
+                if not item.tmdbid:
+                    for title in [item.title, item.original_title]:
+                        if title:
+                            self._untagged_titles.add(
+                                self.__normalize_title(title)
+                            )
+                    continue
+                key = (int(item.tmdbid), item_type)
+                self._items.setdefault(key, []).append(
+                    (server, str(item.item_id))
+                )
+
+    def __get_seasons(self, key: Tuple[int, str]) -> Dict[int, set[int]]:
+        """
+        获取剧集在媒体库中的季集，多个条目时合并
+        查询媒体服务器时不加锁，同时查询同一剧集时使用先保存的结果
+        """
+        with self._lock:
+            seasons = self._seasons.get(key)
+        if seasons is not None:
+            return seasons
+        seasons = {}
+        for server, item_id in self._items.get(key, []):
+            for episode_info in self._mschain.episodes(server, item_id) or []:
+                seasons.setdefault(episode_info.season, set()).update(
+                    episode_info.episodes or []
+                )
+        with self._lock:
+            return self._seasons.setdefault(key, seasons)
+
+    def no_exists_seasons(
+        self, meta: MetaBase, mediainfo: MediaInfo
+    ) -> Tuple[bool, List[int]] | None:
+        """
+        判断媒体库中是否存在
+        :return: 是否全部存在，缺失的季；无法判断时返回None，需要实时查询
+        """
+        if not mediainfo.tmdb_id:
+            return None
+        key = (int(mediainfo.tmdb_id), mediainfo.type.value)
+        if key not in self._items:
+            if not self.complete or any(
+                self.__normalize_title(title) in self._untagged_titles
+                for title in [mediainfo.title, mediainfo.original_title]
+                if title
+            ):
+                return None
+            if mediainfo.type == MediaType.MOVIE:
+                return False, []
+
+        if mediainfo.type == MediaType.MOVIE:
+            return True, []
+        if not mediainfo.seasons:
+            return None
+
+        exist_seasons = self.__get_seasons(key) if key in self._items else {}
+        missing_seasons = []
+        for season, episodes in mediainfo.seasons.items():
+            # 跳过特别篇和没有集数的季
+            if not season or not episodes:
+                continue
+            if meta.begin_season and season not in meta.season_list:
+                continue
+            if not set(episodes).issubset(exist_seasons.get(season, set())):
+                missing_seasons.append(season)
+        return not missing_seasons, missing_seasons
 
 
 class DoubanRankPlus(_PluginBase):
@@ -83,7 +1011,7 @@ class DoubanRankPlus(_PluginBase):
     # 插件图标
     plugin_icon = "https://raw.githubusercontent.com/boeto/MoviePilot-Plugins/main/icons/DouBanRankPlus.png"
     # 插件版本
-    plugin_version = "2.0.0"
+    plugin_version = "2.0.25"
     # 插件作者
     plugin_author = "boeto"
     # 作者主页
@@ -99,9 +1027,17 @@ class DoubanRankPlus(_PluginBase):
     _event = Event()
 
     downloadchain: DownloadChain
+    mediaserverchain: MediaServerChain
     subscribechain: SubscribeChain
     mediachain: MediaChain
     doubanapi: DoubanApi
+    douban_limiter: DoubanRateLimiter
+    history_journal: HistoryJournal
+    douban_cache: ExpiringLRUCache
+    recognize_cache: ExpiringLRUCache
+    tmdb_index: ExpiringLRUCache
+    tmdb_index_missed: ExpiringLRUCache
+    tmdb_mapping: DoubanTmdbMapping | None = None
 
     # 私有属性
     _plugin_id = "DoubanRankPlus"
@@ -137,14 +1073,116 @@ class DoubanRankPlus(_PluginBase):
     _max_sleep_time: int = 10
     _history_type: str = HistoryDataType.LATEST.value
     _is_exit_ip_rate_limit: bool = False
+    _douban_cache_ttl: int = 30
     _is_only_movies: bool = False
+    _douban_budget: int = 0
+    _retry_limit: int = 10
+    _recognize_workers: int = 2
+    _subscribe_workers: int = 1
+    _match_workers: int = 1
 
     _migrate_from_url = ""
     _migrate_api_token = ""
     _migrate_once = False
 
+    # 本次运行的订阅索引
+    _subscription_index: SubscriptionIndex | None = None
+    # 本次运行的媒体库快照
+    _library_snapshot: LibrarySnapshot | None = None
+    # 本次运行已发出的豆瓣请求次数
+    _douban_requests: int = 0
+    _douban_budget_lock = Lock()
+    # 超出豆瓣请求次数后延后到下次运行处理的条目 {key: 条目}
+    _deferred_items: Dict[str, WorkItem] = {}
+    _deferred_lock = Lock()
+    # 本次运行的计划签名和处理进度
+    _plan_signature: str | None = None
+    _plan_watermark: PlanWatermark | None = None
+    # 本次运行出错未完成的条目键，所在榜单不记录指纹
+    _unfinished_keys: set[str] = set()
+
+    # 榜单RSS和迁移请求共用的连接池，插件停止时关闭
+    _session: requests.Session | None = None
+    # 连接池缓存的主机数
+    _session_pool_hosts: int = 10
+
+    # 榜单RSS并发获取线程数
+    _fetch_workers: int = 8
+    # 同一主机的最大并发请求数
+    _fetch_per_host: int = 2
+    # 每处理多少个条目保存一次缓存
+    _cache_save_interval: int = 20
+    # 未识别条目首次重试间隔和最长重试间隔（秒），每次失败后间隔加倍
+    _retry_base_seconds: int = 86400
+    _retry_max_seconds: int = 30 * 86400
+    # 条目优先级权重：榜单排名、出现的榜单数、豆瓣评分
+    _priority_weights: Dict[str, float] = {
+        "rank": 0.6,
+        "feeds": 0.25,
+        "rating": 0.15,
+    }
+    # 流水线各阶段队列长度相对线程数的倍数
+    _pipeline_queue_factor: int = 2
+    # 追加日志超过多少条记录时合并到完整历史
+    _history_compact_size: int = 200
+    # 历史记录分页接口每页最大数量
+    _history_page_max_limit: int = 500
+    # 豆瓣详情缓存最大条目数
+    _douban_cache_size: int = 5000
+    # 豆瓣详情缓存保留的字段
+    _douban_cache_fields = (
+        "id",
+        "title",
+        "original_title",
+        "year",
+        "type",
+        "is_tv",
+    )
+    # 按标题识别结果的有效期（秒）
+    _recognize_cache_ttl: int = 7 * 86400
+    # 按标题识别结果最大条目数
+    _recognize_cache_size: int = 5000
+    # 按标题识别结果保留的媒体信息字段
+    _recognize_cache_fields = (
+        "tmdb_id",
+        "douban_id",
+        "type",
+        "title",
+        "original_title",
+        "year",
+        "seasons",
+        "number_of_seasons",
+        "vote_average",
+        "poster_path",
+        "overview",
+        "genre_ids",
+    )
+    # 豆瓣ID对应TMDB识别结果的有效期（秒）
+    _tmdb_index_ttl: int = 365 * 86400
+    # 确认未匹配到TMDB的豆瓣ID的有效期（秒）
+    _tmdb_index_missed_ttl: int = 7 * 86400
+    # 豆瓣ID对应TMDB识别结果最大条目数
+    _tmdb_index_size: int = 50000
+
+    # 历史记录索引
+    _history_store: HistoryStore | None = None
+    _history_store_lock = Lock()
+    # 追加日志与完整历史的写入锁，合并时不丢失并发追加的记录
+    _history_write_lock = RLock()
+    # 详情页面缓存: (历史记录索引, 缓存键, 页面)
+    _page_cache: (
+        Tuple[HistoryStore, Tuple[Any, ...], List[Dict[str, Any]]] | None
+    ) = None
+    # 历史记录卡片缓存: {unique: (历史记录, 卡片)}
+    _post_content_cache: Dict[str, Tuple[HistoryPayload, Dict[str, Any]]] = {}
+
+    # 榜单RSS条件请求缓存
+    _feed_cache: Dict[str, FeedCache] | None = None
+    _feed_cache_lock = Lock()
+
     def init_plugin(self, config: dict[str, Any] | None = None):
         self.downloadchain = DownloadChain()
+        self.mediaserverchain = MediaServerChain()
         self.subscribechain = SubscribeChain()
         self.mediachain = MediaChain()
         self.doubanapi = DoubanApi()
@@ -213,10 +1251,110 @@ class DoubanRankPlus(_PluginBase):
             self._is_exit_ip_rate_limit = config.get(
                 "is_exit_ip_rate_limit", False
             )
+            self._douban_cache_ttl = (
+                int(str(config.get("douban_cache_ttl", "")).strip())
+                if str(config.get("douban_cache_ttl", "")).strip().isdigit()
+                else 30
+            )
+
+            self._douban_budget = (
+                int(str(config.get("douban_budget", "")).strip())
+                if str(config.get("douban_budget", "")).strip().isdigit()
+                else 0
+            )
+
+            self._retry_limit = (
+                int(str(config.get("retry_limit", "")).strip())
+                if str(config.get("retry_limit", "")).strip().isdigit()
+                else 10
+            )
+
+            self._match_workers = (
+                int(str(config.get("match_workers", "")).strip())
+                if str(config.get("match_workers", "")).strip().isdigit()
+                and int(str(config.get("match_workers", "")).strip()) > 0
+                else 1
+            )
+
+            __pipeline_workers_list = re.split(
+                "[,，]", str(config.get("pipeline_workers", "2,1")).strip()
+            )
+            self._recognize_workers, self._subscribe_workers = 2, 1
+            if len(__pipeline_workers_list) == 2 and all(
+                _workers.strip().isdigit() and int(_workers) > 0
+                for _workers in __pipeline_workers_list
+            ):
+                self._recognize_workers, self._subscribe_workers = map(
+                    int, __pipeline_workers_list
+                )
+            else:
+                logger.warn("识别/订阅线程数配置格式不正确,使用默认值")
+
+        # 历史记录追加日志
+        self.history_journal = HistoryJournal(
+            self.get_data_path() / "history.journal"
+        )
+        self._history_store = None
+        self._page_cache = None
+        self._post_content_cache = {}
+
+        # 豆瓣请求限速，恢复上次运行的速率
+        self.douban_limiter = DoubanRateLimiter(
+            self._min_sleep_time, self._max_sleep_time
+        )
+        self.douban_limiter.set_state(self.get_data("douban_limiter"))
+
+        # 延后处理的条目
+        self._deferred_items = {
+            work_item["key"]: work_item
+            for work_item in self.get_data("deferred_items") or []
+        }
+
+        # 豆瓣IP限制熔断，跨运行保持状态
+        self.douban_breaker = DoubanCircuitBreaker()
+        self.douban_breaker.set_state(self.get_data("douban_breaker"))
+
+        # 豆瓣详情缓存
+        self.douban_cache = ExpiringLRUCache(
+            ttl=self._douban_cache_ttl * 86400,
+            max_size=self._douban_cache_size,
+        )
+        self.douban_cache.load(self.get_data("douban_cache"))
+
+        # 按标题识别结果
+        self.recognize_cache = ExpiringLRUCache(
+            ttl=self._recognize_cache_ttl,
+            max_size=self._recognize_cache_size,
+        )
+        self.recognize_cache.load(self.get_data("recognize_cache"))
+
+        # 豆瓣ID对应TMDB识别结果
+        tmdb_index = self.get_data("tmdb_index") or {}
+        self.tmdb_index = ExpiringLRUCache(
+            ttl=self._tmdb_index_ttl, max_size=self._tmdb_index_size
+        )
+        self.tmdb_index.load(tmdb_index.get("found"))
+        self.tmdb_index_missed = ExpiringLRUCache(
+            ttl=self._tmdb_index_missed_ttl, max_size=self._tmdb_index_size
+        )
+        self.tmdb_index_missed.load(tmdb_index.get("missed"))
 
         # 停止现有任务
         self.stop_service()
 
+        # 离线导入的豆瓣ID映射
+        self.__load_tmdb_mapping()
+
+        # 复用连接，同一主机的连接数与并发请求数一致
+        # 代理与直连的请求由连接池按代理地址分别复用连接
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self._session_pool_hosts,
+            pool_maxsize=self._fetch_per_host,
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
         # 启动服务
         if self._enabled or self._onlyonce:
             if self._onlyonce:
@@ -278,6 +1416,24 @@ class DoubanRankPlus(_PluginBase):
                 "methods": ["GET"],
                 "summary": "删除豆瓣榜单Plus历史记录",
             },
+            {
+                "path": "/delete_tmdb_index",
+                "endpoint": self.delete_tmdb_index,
+                "methods": ["GET"],
+                "summary": "删除豆瓣ID对应的TMDB识别缓存",
+            },
+            {
+                "path": "/import_tmdb_mapping",
+                "endpoint": self.import_tmdb_mapping,
+                "methods": ["POST"],
+                "summary": "导入离线豆瓣ID对应TMDBID映射",
+            },
+            {
+                "path": "/history",
+                "endpoint": self.get_history_page,
+                "methods": ["GET"],
+                "summary": "分页获取豆瓣榜单Plus历史记录",
+            },
             {
                 "path": "/migrate-history",
                 "endpoint": self.get_migrate_history,
@@ -465,8 +1621,8 @@ class DoubanRankPlus(_PluginBase):
                                             "component": "VTextField",
                                             "props": {
                                                 "model": "sleep_time",
-                                                "label": "随机休眠时间范围",
-                                                "placeholder": "默认: 3,10。减少豆瓣访问频率。格式：最小秒数,最大秒数。",
+                                                "label": "豆瓣请求间隔范围",
+                                                "placeholder": "默认: 3,10。请求成功时逐步缩短间隔，触发豆瓣限制时加倍间隔。格式：最小秒数,最大秒数。",
                                             },
                                         }
                                     ],
@@ -483,9 +1639,9 @@ class DoubanRankPlus(_PluginBase):
                                         {
                                             "component": "VTextField",
                                             "props": {
-                                                "model": "vote",
-                                                "label": "评分",
-                                                "placeholder": "评分大于等于该值才订阅",
+                                                "model": "douban_cache_ttl",
+                                                "label": "豆瓣详情缓存天数",
+                                                "placeholder": "默认: 30。缓存豆瓣详情及其来源（电影/剧集），0为不缓存",
                                             },
                                         }
                                     ],
@@ -497,9 +1653,9 @@ class DoubanRankPlus(_PluginBase):
                                         {
                                             "component": "VTextField",
                                             "props": {
-                                                "model": "release_year",
-                                                "label": "上映年份",
-                                                "placeholder": "年份大于等于该值才订阅",
+                                                "model": "pipeline_workers",
+                                                "label": "识别/订阅线程数",
+                                                "placeholder": "默认: 2,1。识别和订阅分阶段并行处理。格式：识别线程数,订阅线程数。",
                                             },
                                         }
                                     ],
@@ -508,34 +1664,17 @@ class DoubanRankPlus(_PluginBase):
                         },
                         {
                             "component": "VRow",
-                            "props": {"cols": 12, "md": 6},
                             "content": [
                                 {
                                     "component": "VCol",
+                                    "props": {"cols": 12, "md": 6},
                                     "content": [
                                         {
-                                            "component": "VSelect",
+                                            "component": "VTextField",
                                             "props": {
-                                                "model": "history_type",
-                                                "label": "数据面板历史显示",
-                                                "items": [
-                                                    {
-                                                        "title": f"{HistoryDataType.LATEST.value}",
-                                                        "value": f"{HistoryDataType.LATEST.value}",
-                                                    },
-                                                    {
-                                                        "title": f"{HistoryDataType.RECOGNIZED.value}",
-                                                        "value": f"{HistoryDataType.RECOGNIZED.value}",
-                                                    },
-                                                    {
-                                                        "title": f"{HistoryDataType.UNRECOGNIZED.value}",
-                                                        "value": f"{HistoryDataType.UNRECOGNIZED.value}",
-                                                    },
-                                                    {
-                                                        "title": f"{HistoryDataType.ALL.value}",
-                                                        "value": f"{HistoryDataType.ALL.value}",
-                                                    },
-                                                ],
+                                                "model": "douban_budget",
+                                                "label": "每次运行豆瓣请求上限",
+                                                "placeholder": "默认: 0，不限制。如 150，超出的条目延后到下次运行优先处理",
                                             },
                                         }
                                     ],
@@ -545,7 +1684,109 @@ class DoubanRankPlus(_PluginBase):
                                     "props": {"cols": 12, "md": 6},
                                     "content": [
                                         {
-                                            "component": "VSelect",
+                                            "component": "VTextField",
+                                            "props": {
+                                                "model": "retry_limit",
+                                                "label": "每次运行未识别重试数量",
+                                                "placeholder": "默认: 10，0为不重试。未识别条目按1、2、4...天的间隔自动重试",
+                                            },
+                                        }
+                                    ],
+                                },
+                            ],
+                        },
+                        {
+                            "component": "VRow",
+                            "content": [
+                                {
+                                    "component": "VCol",
+                                    "props": {"cols": 12, "md": 6},
+                                    "content": [
+                                        {
+                                            "component": "VTextField",
+                                            "props": {
+                                                "model": "match_workers",
+                                                "label": "TMDB名称匹配并发数",
+                                                "placeholder": "默认: 1，逐个匹配。大于1时同时用多个名称查询TMDB，取优先级最高的结果",
+                                            },
+                                        }
+                                    ],
+                                },
+                            ],
+                        },
+                        {
+                            "component": "VRow",
+                            "content": [
+                                {
+                                    "component": "VCol",
+                                    "props": {"cols": 12, "md": 6},
+                                    "content": [
+                                        {
+                                            "component": "VTextField",
+                                            "props": {
+                                                "model": "vote",
+                                                "label": "评分",
+                                                "placeholder": "评分大于等于该值才订阅",
+                                            },
+                                        }
+                                    ],
+                                },
+                                {
+                                    "component": "VCol",
+                                    "props": {"cols": 12, "md": 6},
+                                    "content": [
+                                        {
+                                            "component": "VTextField",
+                                            "props": {
+                                                "model": "release_year",
+                                                "label": "上映年份",
+                                                "placeholder": "年份大于等于该值才订阅",
+                                            },
+                                        }
+                                    ],
+                                },
+                            ],
+                        },
+                        {
+                            "component": "VRow",
+                            "props": {"cols": 12, "md": 6},
+                            "content": [
+                                {
+                                    "component": "VCol",
+                                    "content": [
+                                        {
+                                            "component": "VSelect",
+                                            "props": {
+                                                "model": "history_type",
+                                                "label": "数据面板历史显示",
+                                                "items": [
+                                                    {
+                                                        "title": f"{HistoryDataType.LATEST.value}",
+                                                        "value": f"{HistoryDataType.LATEST.value}",
+                                                    },
+                                                    {
+                                                        "title": f"{HistoryDataType.RECOGNIZED.value}",
+                                                        "value": f"{HistoryDataType.RECOGNIZED.value}",
+                                                    },
+                                                    {
+                                                        "title": f"{HistoryDataType.UNRECOGNIZED.value}",
+                                                        "value": f"{HistoryDataType.UNRECOGNIZED.value}",
+                                                    },
+                                                    {
+                                                        "title": f"{HistoryDataType.ALL.value}",
+                                                        "value": f"{HistoryDataType.ALL.value}",
+                                                    },
+                                                ],
+                                            },
+                                        }
+                                    ],
+                                },
+                                {
+                                    "component": "VCol",
+                                    "props": {"cols": 12, "md": 6},
+                                    "content": [
+                                        {
+                                            "component": "VSelect",
                                             "props": {
                                                 "chips": True,
                                                 "multiple": True,
@@ -742,6 +1983,11 @@ class DoubanRankPlus(_PluginBase):
                 "is_only_movies": False,
                 "history_type": HistoryDataType.LATEST.value,
                 "is_exit_ip_rate_limit": False,
+                "douban_cache_ttl": "30",
+                "pipeline_workers": "2,1",
+                "douban_budget": "0",
+                "retry_limit": "10",
+                "match_workers": "1",
                 "migrate_from_url": "",
                 "migrate_api_token": "",
                 "migrate_once": False,
@@ -793,6 +2039,13 @@ class DoubanRankPlus(_PluginBase):
                     "M241.664 921.6H102.4v-139.264c0-24.576-16.384-40.96-40.96-40.96s-40.96 16.384-40.96 40.96v180.224c0 24.576 16.384 40.96 40.96 40.96h180.224c24.576 0 40.96-16.384 40.96-40.96s-16.384-40.96-40.96-40.96zM245.76 20.48H61.44c-24.576 0-40.96 16.384-40.96 40.96V245.76c0 24.576 16.384 40.96 40.96 40.96s40.96-16.384 40.96-40.96V102.4H245.76c24.576 0 40.96-16.384 40.96-40.96s-20.48-40.96-40.96-40.96zM962.56 20.48h-180.224c-24.576 0-40.96 16.384-40.96 40.96s16.384 40.96 40.96 40.96h139.264v139.264c0 24.576 16.384 40.96 40.96 40.96s40.96-16.384 40.96-40.96V61.44c0-24.576-16.384-40.96-40.96-40.96zM962.56 741.376c-24.576 0-40.96 16.384-40.96 40.96v143.36h-139.264c-24.576 0-40.96 16.384-40.96 40.96s16.384 40.96 40.96 40.96h180.224c24.576 0 40.96-16.384 40.96-40.96v-184.32c0-24.576-16.384-40.96-40.96-40.96zM696.32 401.408c0-102.4-81.92-184.32-184.32-184.32S327.68 299.008 327.68 401.408c0 57.344 24.576 110.592 69.632 143.36l-36.864 204.8c-4.096 12.288 0 28.672 8.192 36.864 8.192 12.288 20.48 16.384 36.864 16.384h212.992c12.288 0 28.672-4.096 36.864-16.384 8.192-12.288 12.288-24.576 8.192-36.864l-36.864-204.8c45.056-28.672 69.632-81.92 69.632-143.36z"
                 ],
             ),
+            Icons.DEFERRED: DoubanRankPlus.__get_svg_content(
+                color,
+                [
+                    "M512 64C264.6 64 64 264.6 64 512s200.6 448 448 448 448-200.6 448-448S759.4 64 512 64z m0 820c-205.4 0-372-166.6-372-372s166.6-372 372-372 372 166.6 372 372-166.6 372-372 372z",
+                    "M686.7 638.6L544.1 535.5V288c0-4.4-3.6-8-8-8H488c-4.4 0-8 3.6-8 8v275.4c0 2.6 1.2 5 3.3 6.5l165.4 120.6c3.6 2.6 8.6 1.8 11.2-1.7l28.6-39c2.6-3.7 1.8-8.7-1.8-11.2z",
+                ],
+            ),
             Icons.RSS: DoubanRankPlus.__get_svg_content(
                 color,
                 [
@@ -892,6 +2145,11 @@ class DoubanRankPlus(_PluginBase):
                 "value": len(addr_list),
                 "icon_name": Icons.RSS,
             },
+            {
+                "title": "延后处理数量",
+                "value": len(self._deferred_items),
+                "icon_name": Icons.DEFERRED,
+            },
         ]
 
         content = list(
@@ -1051,8 +2309,20 @@ class DoubanRankPlus(_PluginBase):
                 }
             ]
         else:
+            # 复用未变化记录的卡片
+            post_content_cache: Dict[
+                str, Tuple[HistoryPayload, Dict[str, Any]]
+            ] = {}
             for history in historys:
-                posts_content.append(self.__get_history_post_content(history))
+                unique = str(history.get("unique"))
+                cache = self._post_content_cache.get(unique)
+                if cache and cache[0] is history:
+                    post_content = cache[1]
+                else:
+                    post_content = self.__get_history_post_content(history)
+                post_content_cache[unique] = (history, post_content)
+                posts_content.append(post_content)
+            self._post_content_cache = post_content_cache
 
         component = {
             "component": "div",
@@ -1087,8 +2357,24 @@ class DoubanRankPlus(_PluginBase):
         """
 
         # 查询历史记录
-        historys = self.get_data("history")
-        if not historys:
+        history_store = self.__get_history_store()
+
+        # 历史记录未变化时直接使用缓存的页面
+        page_key = (
+            history_store.version,
+            self._history_type,
+            len(self._deferred_items),
+        )
+        page_cache = self._page_cache
+        if (
+            page_cache
+            and page_cache[0] is history_store
+            and page_cache[1] == page_key
+        ):
+            return page_cache[2]
+
+        # 有延后处理的条目时仍展示统计，便于查看延后数量
+        if not len(history_store) and not self._deferred_items:
             return [
                 {
                     "component": "div",
@@ -1099,42 +2385,28 @@ class DoubanRankPlus(_PluginBase):
                 }
             ]
 
-        # 数据按时间降序排序
-        historys = sorted(
-            historys, key=lambda x: x.get("time_full"), reverse=True
-        )
-
-        history_recognized = []
-        history_unrecognized = []
-
-        for history in historys:
-            if history.get("status") != Status.UNRECOGNIZED.value:
-                history_recognized.append(history)
-            else:
-                history_unrecognized.append(history)
-
-        history_recognized = sorted(
-            history_recognized, key=lambda x: x.get("time_full"), reverse=True
+        historys_total = history_store.count()
+        historys_unrecognized_total = history_store.count(
+            Status.UNRECOGNIZED.value
         )
-        history_unrecognized = sorted(
-            history_unrecognized,
-            key=lambda x: x.get("time_full"),
-            reverse=True,
+        historys_recognized_total = (
+            historys_total - historys_unrecognized_total
         )
 
-        historys_total = len(historys)
-        historys_recognized_total = len(history_recognized)
-        historys_unrecognized_total = len(history_unrecognized)
-
+        # 数据按时间降序排列
         historys_in_type: list[HistoryPayload] | None = None
         if self._history_type == HistoryDataType.LATEST.value:
-            historys_in_type = historys[:12]
+            historys_in_type = history_store.latest(12)
         elif self._history_type == HistoryDataType.RECOGNIZED.value:
-            historys_in_type = history_recognized
+            historys_in_type = history_store.latest(
+                exclude_status=Status.UNRECOGNIZED.value
+            )
         elif self._history_type == HistoryDataType.UNRECOGNIZED.value:
-            historys_in_type = history_unrecognized
+            historys_in_type = history_store.latest(
+                status=Status.UNRECOGNIZED.value
+            )
         elif self._history_type == HistoryDataType.ALL.value:
-            historys_in_type = historys
+            historys_in_type = history_store.latest()
 
         historys_posts_content = self.__get_historys_posts_content(
             historys_in_type
@@ -1146,7 +2418,7 @@ class DoubanRankPlus(_PluginBase):
         )
 
         # 拼装页面
-        return [
+        page = [
             {
                 "component": "div",
                 "content": [
@@ -1155,6 +2427,8 @@ class DoubanRankPlus(_PluginBase):
                 ],
             }
         ]
+        self._page_cache = (history_store, page_key, page)
+        return page
 
     def stop_service(self):
         """
@@ -1168,6 +2442,12 @@ class DoubanRankPlus(_PluginBase):
                     self._scheduler.shutdown()
                     self._event.clear()
                 self._scheduler = None
+            if self._session:
+                self._session.close()
+                self._session = None
+            if self.tmdb_mapping:
+                self.tmdb_mapping.close()
+                self.tmdb_mapping = None
         except Exception as e:
             print(str(e))
 
@@ -1187,15 +2467,160 @@ class DoubanRankPlus(_PluginBase):
         validation_response = self.__validate_token(apikey)
         if validation_response:
             return validation_response
-        # 历史记录
-        historys = self.get_data("history")
-        if not historys:
-            return Response(success=False, message="未找到历史记录")
         # 删除指定记录
-        historys = [h for h in historys if h.get("unique") != key]
-        self.save_data("history", historys)
+        if not self.__get_history_store().delete(key):
+            return Response(success=False, message="未找到历史记录")
+        self.__save_history()
+        # 删除的条目需要重新处理
+        self.__clear_feed_fingerprints()
+        return Response(success=True, message="删除成功")
+
+    def delete_tmdb_index(self, apikey: str, doubanid: str = ""):
+        """
+        删除豆瓣ID对应的TMDB识别缓存，未指定豆瓣ID时清空所有缓存
+        """
+        logger.debug(f"删除TMDB识别缓存:::{doubanid}")
+        validation_response = self.__validate_token(apikey)
+        if validation_response:
+            return validation_response
+
+        if doubanid:
+            found = self.tmdb_index.delete(doubanid)
+            missed = self.tmdb_index_missed.delete(doubanid)
+            if not found and not missed:
+                return Response(success=False, message="未找到识别缓存")
+        else:
+            self.tmdb_index = ExpiringLRUCache(
+                ttl=self._tmdb_index_ttl, max_size=self._tmdb_index_size
+            )
+            self.tmdb_index_missed = ExpiringLRUCache(
+                ttl=self._tmdb_index_missed_ttl, max_size=self._tmdb_index_size
+            )
+        self.__save_tmdb_index()
         return Response(success=True, message="删除成功")
 
+    def import_tmdb_mapping(self, apikey: str, path: str):
+        """
+        导入离线豆瓣ID对应TMDBID映射，替换已导入的映射
+        :param path: 插件数据目录中的CSV文件路径，每行为 豆瓣ID,TMDBID,类型，类型可为 movie/tv、电影/电视剧
+        """
+        logger.debug(f"导入豆瓣ID映射:::{path}")
+        validation_response = self.__validate_token(apikey)
+        if validation_response:
+            return validation_response
+
+        data_path = self.get_data_path().resolve()
+        source = (data_path / path).resolve()
+        if not source.is_relative_to(data_path):
+            return Response(
+                success=False,
+                message=f"映射文件需位于插件数据目录：{data_path}",
+            )
+        if not source.is_file():
+            return Response(success=False, message="映射文件不存在")
+
+        media_types = {
+            "movie": MediaType.MOVIE,
+            "tv": MediaType.TV,
+            MediaType.MOVIE.value: MediaType.MOVIE,
+            MediaType.TV.value: MediaType.TV,
+        }
+        skipped = 0
+
+        def rows() -> Iterator[Tuple[int, int, MediaType | None]]:
+            nonlocal skipped
+            with source.open("r", encoding="utf-8-sig", newline="") as f:
+                for row in csv.reader(f):
+                    values = [value.strip() for value in row]
+                    if (
+                        len(values) < 2
+                        or not all(
+                            value.isascii() and value.isdigit()
+                            for value in values[:2]
+                        )
+                        or not DoubanTmdbMapping.is_valid(
+                            int(values[0]), int(values[1])
+                        )
+                    ):
+                        # 表头、格式错误或超出范围的行
+                        skipped += 1
+                        continue
+                    mtype = values[2].lower() if len(values) > 2 else ""
+                    yield int(values[0]), int(values[1]), media_types.get(
+                        mtype
+                    )
+
+        try:
+            count = DoubanTmdbMapping.build(
+                self.__get_tmdb_mapping_path(), rows()
+            )
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            logger.error(f"导入豆瓣ID映射失败：{str(e)}")
+            return Response(success=False, message=f"导入失败：{str(e)}")
+
+        self.__load_tmdb_mapping()
+        logger.info(f"已导入豆瓣ID映射 {count} 条，跳过 {skipped} 行")
+        return Response(
+            success=True,
+            message=f"已导入 {count} 条，跳过 {skipped} 行",
+            data={"count": count, "skipped": skipped},
+        )
+
+    def get_history_page(
+        self,
+        apikey: str,
+        cursor: str = "",
+        limit: int = 50,
+        status: str = "",
+        mtype: str = "",
+        year: str = "",
+        fields: str = "",
+    ):
+        """
+        按时间降序分页获取历史记录
+        :param cursor: 上一页返回的 next_cursor，为空时从最新开始
+        :param limit:  每页数量
+        :param status: 按状态过滤，如 已添加订阅
+        :param mtype:  按类型过滤，如 电影、电视剧
+        :param year:   按年份过滤
+        :param fields: 返回的字段，逗号分隔，为空时返回所有字段
+        """
+        logger.debug(f"分页获取历史记录:::{cursor}")
+        validation_response = self.__validate_token(apikey)
+        if validation_response:
+            return validation_response
+
+        cursor_key = None
+        if cursor:
+            time_full, sep, unique = cursor.partition("|")
+            if not sep:
+                return Response(success=False, message="游标格式错误")
+            cursor_key = (time_full, unique)
+        limit = max(1, min(int(limit), self._history_page_max_limit))
+
+        records, next_key = self.__get_history_store().page(
+            cursor=cursor_key,
+            limit=limit,
+            status=status or None,
+            mtype=mtype or None,
+            year=year or None,
+        )
+        field_names = [
+            name.strip() for name in fields.split(",") if name.strip()
+        ]
+        if field_names:
+            records = [
+                {name: record.get(name) for name in field_names}
+                for record in records
+            ]
+        return Response(
+            success=True,
+            data={
+                "items": records,
+                "next_cursor": "|".join(next_key) if next_key else None,
+            },
+        )
+
     def get_migrate_history(self, migrate_api_token: str):
         """
         获取迁移l历史记录
@@ -1205,7 +2630,7 @@ class DoubanRankPlus(_PluginBase):
         if validation_response:
             return validation_response
 
-        return self.get_data("history")
+        return self.__get_history_store().records()
 
     def get_migrate_config(self, migrate_api_token: str):
         """
@@ -1241,6 +2666,11 @@ class DoubanRankPlus(_PluginBase):
             "sleep_time": f"{self._min_sleep_time},{self._max_sleep_time}",
             "history_type": self._history_type,
             "is_exit_ip_rate_limit": self._is_exit_ip_rate_limit,
+            "douban_cache_ttl": str(self._douban_cache_ttl),
+            "pipeline_workers": f"{self._recognize_workers},{self._subscribe_workers}",
+            "douban_budget": str(self._douban_budget),
+            "retry_limit": str(self._retry_limit),
+            "match_workers": str(self._match_workers),
             "migrate_from_url": self._migrate_from_url.rstrip("/"),
             "migrate_api_token": self._migrate_api_token,
             "migrate_once": self._migrate_once,
@@ -1307,7 +2737,10 @@ class DoubanRankPlus(_PluginBase):
 
                 __original_history = self.__get_migrate_history()
                 if __original_history:
-                    self.save_data("history", __original_history)
+                    with self._history_store_lock:
+                        self._history_store = HistoryStore(__original_history)
+                    self.__save_history()
+                    self.__clear_feed_fingerprints()
                 else:
                     logger.warn("未获取到历史记录，结束程序")
                     return
@@ -1333,437 +2766,1187 @@ class DoubanRankPlus(_PluginBase):
             logger.info(f"共 {len(addr_list)} 个榜单RSS地址需要刷新")
 
         # 读取历史记录
+        history_store = self.__get_history_store()
         if self._clearflag:
-            history = []  # type: ignore
-            self.save_data("history", history)
+            with self._history_store_lock:
+                self._history_store = history_store = HistoryStore()
+            self.__save_history()
+            self.__clear_feed_fingerprints()
             # 历史只清理一次
             self._clearflag = False
             logger.info(f"已清理所有 {self.plugin_name} 的历史记录")
-        else:
-            history = self.get_data("history") or []
-            if history and self._clearflag_unrecognized:
-                original_length = len(history)
-                history = [
-                    h
-                    for h in history
-                    if h.get("status") != Status.UNRECOGNIZED.value
-                ]
-                deleted_count = original_length - len(history)
-                self.save_data("history", history)
-                # 未识别历史只清理一次
-                self._clearflag_unrecognized = False
-                logger.info(
-                    f"已清理 {deleted_count} 条 {self.plugin_name} 未识别的历史记录"
-                )
+        elif len(history_store) and self._clearflag_unrecognized:
+            deleted_count = history_store.delete_status(
+                Status.UNRECOGNIZED.value
+            )
+            self.__save_history()
+            # 未识别的条目需要重新匹配TMDB
+            self.tmdb_index_missed = ExpiringLRUCache(
+                ttl=self._tmdb_index_missed_ttl,
+                max_size=self._tmdb_index_size,
+            )
+            self.__save_tmdb_index()
+            self.__clear_feed_fingerprints()
+            # 未识别历史只清理一次
+            self._clearflag_unrecognized = False
+            logger.info(
+                f"已清理 {deleted_count} 条 {self.plugin_name} 未识别的历史记录"
+            )
+
+        # 解析榜单地址
+        addr_results = {
+            _addr: DoubanRankPlus.__get_info_addr(_addr)
+            for _addr in addr_list
+            if _addr
+        }
+
+        # 并发预取所有榜单RSS
+        rss_infos_map = self.__prefetch_rss_infos(
+            [
+                str(addr_result.get("addr"))
+                for addr_result in addr_results.values()
+                if addr_result.get("addr")
+            ]
+        )
 
-        # 提取 history 中的 unique 值到一个集合中
-        unique_flags = {h.get("unique") for h in history if h is not None}
+        # 内容未变化的榜单不再处理
+        feed_fingerprints, skipped_addrs = self.__check_feed_fingerprints(
+            addr_results, rss_infos_map
+        )
 
-        # 初始化豆瓣IP限制判断
-        douban_last_ip_rate_limit_datetime = None
-        douban_ip_rate_limit_times = 0
+        # 合并所有榜单的条目
+        work_items = self.__plan_work_items(
+            [
+                addr_results[_addr]
+                for _addr in addr_list
+                if _addr and _addr not in skipped_addrs
+            ],
+            rss_infos_map,
+        )
 
-        # count_addr_list = 0
-        for addr_index, _addr in enumerate(addr_list):
-            # count_addr_list += 1
-            # if addr_index == 5 or addr_index == 5:
-            #     break
+        # 从上次中断的检查点继续
+        self._plan_signature = DoubanRankPlus.__get_plan_signature(work_items)
+        watermark = self.__restore_checkpoint(self._plan_signature)
 
-            if not _addr:
-                continue
-            try:
-                logger.info(f"获取RSS：{_addr} ...")
-                addr_result = DoubanRankPlus.__get_info_addr(_addr)
-                addr = addr_result.get("addr", None)
-                customize_save_paths = addr_result.get(
-                    "customize_save_paths", None
+        processed_indexes = {
+            work_item["index"]
+            for work_item in work_items
+            if any(
+                unique_flag in history_store
+                for unique_flag in work_item["unique_flags"]
+            )
+        }
+        # 到期的未识别条目重新处理，检查点之前的条目也需要重试
+        retry_indexes = self.__get_retry_indexes(work_items, history_store)
+        processed_indexes -= retry_indexes
+        self._plan_watermark = PlanWatermark(processed_indexes, watermark)
+        pending_items = [
+            work_item
+            for work_item in work_items
+            if work_item["index"] not in processed_indexes
+            and (
+                work_item["index"] >= self._plan_watermark.value
+                or work_item["index"] in retry_indexes
+            )
+        ]
+        logger.info(
+            f"共 {len(work_items)} 个不重复条目, 已处理过 {len(work_items) - len(pending_items)} 个, 待处理 {len(pending_items)} 个"
+        )
+
+        # 上次运行延后处理的条目优先处理
+        deferred_items = self.__get_deferred_items(history_store)
+        if deferred_items:
+            deferred_keys = {work_item["key"] for work_item in deferred_items}
+            pending_items = deferred_items + [
+                work_item
+                for work_item in pending_items
+                if work_item["key"] not in deferred_keys
+            ]
+            logger.info(f"优先处理上次运行延后的 {len(deferred_items)} 个条目")
+        self._douban_requests = 0
+        self._unfinished_keys = set()
+        self.recognize_cache.hits = self.recognize_cache.misses = 0
+
+        is_completed = False
+        try:
+            if pending_items:
+                # 加载当前所有订阅，运行期间不再逐条查询数据库
+                self._subscription_index = self.__load_subscription_index()
+                self._library_snapshot = self.__load_library_snapshot()
+            is_completed = self.__run_pipeline(pending_items)
+        finally:
+            if self.recognize_cache.hits or self.recognize_cache.misses:
+                logger.info(
+                    f"按标题识别缓存命中 {self.recognize_cache.hits} 次, 未命中 {self.recognize_cache.misses} 次"
                 )
-                subscription_type = addr_result.get("subscription_type", None)
+            # 保存历史记录和检查点
+            logger.info("保存榜单处理后的历史记录")
+            self.__save_checkpoint(is_completed)
+            self._subscription_index = None
+            self._library_snapshot = None
+            self._plan_signature = None
+            self._plan_watermark = None
+
+        if not is_completed:
+            return
+        # 完整运行后才记录榜单指纹，中断时下次仍处理这些榜单
+        self.__save_feed_fingerprints(
+            feed_fingerprints,
+            addr_results,
+            rss_infos_map,
+            skipped_addrs,
+            work_items,
+        )
+        logger.info("所有榜单RSS刷新完成")
 
-                logger.debug(f"addr::: {addr}")
-                logger.debug(f"customize_save_paths::: {customize_save_paths}")
-                logger.debug(f"subscription_type::: {subscription_type}")
+    def __run_pipeline(self, pending_items: List[WorkItem]) -> bool:
+        """
+        分阶段处理条目：识别线程识别媒体信息后放入订阅队列，由订阅线程检查媒体库并添加订阅
+        各阶段之间使用有界队列连接，识别的网络请求与订阅的数据库操作可以同时进行
+        :return: 是否处理完所有条目
+        """
+        recognize_queue: Queue[WorkItem | None] = Queue(
+            maxsize=self._recognize_workers * self._pipeline_queue_factor
+        )
+        subscribe_queue: Queue[RecognizedItem | None] = Queue(
+            maxsize=self._subscribe_workers * self._pipeline_queue_factor
+        )
+        # 任一阶段要求结束处理时设置，后续条目不再处理
+        stop_event = Event()
+        progress_lock = Lock()
+        progress = {"recognized": 0, "finished": 0}
+
+        def __finish_item(
+            work_item: WorkItem, is_done: bool, is_deferred: bool = False
+        ) -> None:
+            """
+            :param is_done:     条目是否已处理完成，出错或中断的条目下次运行重新处理
+            :param is_deferred: 条目是否已加入延后处理队列，由队列负责下次处理，不阻塞处理进度
+            """
+            if (is_done or is_deferred) and self._plan_watermark:
+                self._plan_watermark.finish(work_item["index"])
+            if not is_done and not is_deferred:
+                with progress_lock:
+                    self._unfinished_keys.add(work_item["key"])
+            if is_done:
+                with self._deferred_lock:
+                    self._deferred_items.pop(work_item["key"], None)
+            with progress_lock:
+                progress["finished"] += 1
+                if progress["finished"] % self._cache_save_interval != 0:
+                    return
+            self.__save_checkpoint()
 
-                rss_infos = self.__get_rss_info(addr)
-                if not rss_infos:
-                    logger.error(f"RSS地址：{addr} ，未查询到数据")
+        def __recognize_worker() -> None:
+            while True:
+                work_item = recognize_queue.get()
+                if work_item is None:
+                    return
+                if stop_event.is_set() or self._event.is_set():
                     continue
-                else:
+
+                with progress_lock:
+                    progress["recognized"] += 1
                     logger.info(
-                        f"RSS地址：{addr} ，共 {len(rss_infos)} 条数据"
+                        f"条目处理进度: {progress['recognized']}/{len(pending_items)}"
                     )
+                try:
+                    is_continue, recognized_item = self.__recognize_work_item(
+                        work_item
+                    )
+                except DoubanBudgetExceeded:
+                    self.__defer_work_item(work_item)
+                    __finish_item(work_item, False, is_deferred=True)
+                    continue
+                except Exception as e:
+                    logger.error(
+                        f"识别条目：{work_item['rss_info'].get('title')} 出错: {str(e)}"
+                    )
+                    __finish_item(work_item, False)
+                    continue
+                if not is_continue:
+                    stop_event.set()
+                if recognized_item:
+                    subscribe_queue.put(recognized_item)
+                else:
+                    __finish_item(work_item, is_continue)
 
-                for rss_info_index, rss_info in enumerate(rss_infos):
-                    if self._event.is_set():
-                        logger.info("订阅服务停止")
-                        return
-                    mtype = None
-
-                    logger.info(
-                        f"第 {addr_index + 1}/{len(addr_list)} 条订阅数据处理进度: {rss_info_index + 1}/{len(rss_infos)}"
+        def __subscribe_worker() -> None:
+            while True:
+                recognized_item = subscribe_queue.get()
+                if recognized_item is None:
+                    return
+                is_done = False
+                try:
+                    self.__subscribe_work_item(recognized_item)
+                    is_done = True
+                except Exception as e:
+                    logger.error(
+                        f"订阅条目：{recognized_item['work_item']['rss_info'].get('title')} 出错: {str(e)}"
                     )
+                __finish_item(recognized_item["work_item"], is_done)
+
+        with ThreadPoolExecutor(
+            max_workers=self._recognize_workers + self._subscribe_workers,
+            thread_name_prefix=f"{self._plugin_id}-pipeline",
+        ) as executor:
+            subscribe_futures = [
+                executor.submit(__subscribe_worker)
+                for _ in range(self._subscribe_workers)
+            ]
+            recognize_futures = [
+                executor.submit(__recognize_worker)
+                for _ in range(self._recognize_workers)
+            ]
+            try:
+                for work_item in pending_items:
+                    if stop_event.is_set() or self._event.is_set():
+                        break
+                    recognize_queue.put(work_item)
+            finally:
+                for _ in recognize_futures:
+                    recognize_queue.put(None)
+                wait(recognize_futures)
+                # 已识别的条目继续完成订阅
+                for _ in subscribe_futures:
+                    subscribe_queue.put(None)
+                wait(subscribe_futures)
+
+        if self._event.is_set():
+            logger.info("订阅服务停止")
+            return False
+        return not stop_event.is_set()
+
+    def __recognize_work_item(
+        self,
+        work_item: WorkItem,
+    ) -> Tuple[bool, RecognizedItem | None]:
+        """
+        识别一个榜单条目的媒体信息，未识别时直接添加到历史
+        :return: 是否继续处理后续条目，已识别的条目
+        """
+        rss_info = work_item["rss_info"]
+        mtype = None
+
+        logger.debug(f"rss_info:::{rss_info}")
+        title = rss_info.get("title")
+        douban_id = rss_info.get("doubanid")
+        year = rss_info.get("year")
+        type_str = rss_info.get("mtype")
+
+        if type_str == "movie":
+            mtype = MediaType.MOVIE
+        elif type_str:
+            mtype = MediaType.TV
+        unique_flag = work_item["unique_flags"][0]
+        logger.debug(f"unique_flag:::{unique_flag}")
+
+        logger.info(
+            f"开始处理: Title: {title}, Year:{year}, DBID:{douban_id}, Type:{mtype}, 榜单数: {len(work_item['options'])}, 优先级: {work_item.get('priority')}"
+        )
+        # 元数据
+        meta = MetaInfo(title)
+        meta.year = year
+        if mtype:
+            meta.type = mtype
+        logger.debug(f"MetaInfo meta from rss_info title:::{meta}")
+
+        # 识别媒体信息
+        # 离线映射、识别缓存和豆瓣信息缓存均为本地读取，不受豆瓣熔断影响
+        # 只有实际请求豆瓣时才判断熔断状态
+        if douban_id and settings.RECOGNIZE_SOURCE == "themoviedb":
+            logger.info(
+                f"开始通过豆瓣ID {douban_id} 获取 {title} 的TMDB信息, 类型: {meta.type}"
+            )
 
-                    logger.debug(f"rss_info:::{rss_info}")
-                    title = rss_info.get("title")
-                    if not title:
-                        logger.warn("标题为空，无法处理")
-                        continue
+            tmdbinfo, is_ip_rate_limit = self.__get_tmdbinfo_by_doubanid(
+                doubanid=douban_id, mtype=meta.type
+            )
+            if self._event.is_set():
+                logger.info("订阅服务停止")
+                return False, None
 
-                    douban_id = rss_info.get("doubanid")
-                    year = rss_info.get("year")
-                    type_str = rss_info.get("mtype")
+            if not tmdbinfo and not is_ip_rate_limit:
+                logger.warn(
+                    f"未识别到 {title} 的TMDB信息, 豆瓣ID: {douban_id} "
+                )
+                # 存储历史记录
+                history_payload = (
+                    DoubanRankPlus.__get_history_unrecognized_payload(
+                        title,
+                        unique_flag,
+                        year,
+                        douban_id,
+                    )
+                )
+                self.__add_history(history_payload)
+                logger.debug(f"已添加到历史：{history_payload}")
+                return True, None
+            elif is_ip_rate_limit:
+                logger.warn(
+                    f"未能从豆瓣获取数据, 触发豆瓣IP速率限制, 豆瓣ID: {douban_id}"
+                )
+                if self._is_exit_ip_rate_limit:
+                    logger.info("结束处理")
+                    return False, None
 
-                    if type_str == "movie":
-                        mtype = MediaType.MOVIE
-                    elif type_str:
-                        mtype = MediaType.TV
-                    unique_flag = f"{self.plugin_config_prefix}{title}_{year}_(DB:{douban_id})"
-                    logger.debug(f"unique_flag:::{unique_flag}")
+                logger.warn(
+                    f"熔断期间切换媒体识别, 熔断至: {self.douban_breaker.open_until}, 已连续触发次数: {self.douban_breaker.trip_times}"
+                )
+                logger.info(f"切换识别 {title} 的媒体信息, 类型: {meta.type}")
 
-                    # 在集合中查找 unique_flag
-                    if unique_flag in unique_flags:
-                        logger.info(
-                            f"已处理过: Title: {title}, Year:{year}, DBID:{douban_id}"
+                mediainfo = self.__recognize_media_by_title(meta, title)
+                if not mediainfo:
+                    logger.warn(
+                        f"未识别到 {title} 的媒体信息, 豆瓣ID {douban_id}"
+                    )
+                    # 存储历史记录
+                    history_payload = (
+                        DoubanRankPlus.__get_history_unrecognized_payload(
+                            title, unique_flag, year
                         )
-                        continue
-
-                    logger.info(
-                        f"开始处理: Title: {title}, Year:{year}, DBID:{douban_id}, Type:{mtype}"
                     )
-                    # 元数据
-                    meta = MetaInfo(title)
-                    meta.year = year
-                    if mtype:
-                        meta.type = mtype
-                    logger.debug(f"MetaInfo meta from rss_info title:::{meta}")
-
-                    # 豆瓣IP限制判断
-                    if douban_last_ip_rate_limit_datetime:
-                        if (
-                            datetime.datetime.now(
-                                tz=pytz.timezone(settings.TZ)
-                            )
-                            - douban_last_ip_rate_limit_datetime
-                        ).seconds > 4200:
-                            # 超过70分钟，重置
-                            logger.info(
-                                f"解除豆瓣IP限制, 上次触发时间为: {douban_last_ip_rate_limit_datetime}, 已触发次数: {douban_ip_rate_limit_times}"
-                            )
-                            douban_last_ip_rate_limit_datetime = None
-
-                    # 识别媒体信息
-                    if douban_id and not douban_last_ip_rate_limit_datetime:
-                        # 随机休眠
-                        random_sleep_time = round(
-                            random.uniform(
-                                self._min_sleep_time, self._max_sleep_time
-                            ),
-                            1,
+                    self.__add_history(history_payload)
+                    logger.debug(f"已添加到历史：{history_payload}")
+                    return True, None
+            else:
+                mediainfo = self.__recognize_media_by_tmdbinfo(
+                    meta, title, douban_id, tmdbinfo  # type: ignore
+                )
+                if not mediainfo:
+                    # 存储历史记录
+                    history_payload = (
+                        DoubanRankPlus.__get_history_unrecognized_payload(
+                            title, unique_flag, year, douban_id
                         )
+                    )
+                    self.__add_history(history_payload)
+                    logger.debug(f"已添加到历史：{history_payload}")
+                    return True, None
 
-                        if random_sleep_time:
-                            logger.info(
-                                f"随机休眠范围: {self._min_sleep_time},{self._max_sleep_time}, 此次休眠时间: {random_sleep_time} 秒"
-                            )
-                            time.sleep(random_sleep_time)
-
-                        # 识别豆瓣信息
-                        if settings.RECOGNIZE_SOURCE == "themoviedb":
-                            logger.info(
-                                f"开始通过豆瓣ID {douban_id} 获取 {title} 的TMDB信息, 类型: {meta.type}"
-                            )
-
-                            tmdbinfo, is_ip_rate_limit = (
-                                self.__get_tmdbinfo_by_doubanid(
-                                    doubanid=douban_id, mtype=meta.type
-                                )
-                            )
-
-                            if not tmdbinfo and not is_ip_rate_limit:
-                                logger.warn(
-                                    f"未识别到 {title} 的TMDB信息, 豆瓣ID: {douban_id} "
-                                )
-                                # 存储历史记录
-                                history_payload = DoubanRankPlus.__get_history_unrecognized_payload(
-                                    title,
-                                    unique_flag,
-                                    year,
-                                    douban_id,
-                                )
-                                history.append(history_payload)
-                                unique_flags.add(unique_flag)
-                                logger.debug(
-                                    f"已添加到历史：{history_payload}"
-                                )
-                                continue
-                            elif is_ip_rate_limit:
-                                logger.warn(
-                                    f"未能从豆瓣获取数据, 触发豆瓣IP速率限制, 豆瓣ID: {douban_id}"
-                                )
-                                if self._is_exit_ip_rate_limit:
-                                    logger.info("结束处理")
-                                    return
-
-                                douban_ip_rate_limit_times = (
-                                    douban_ip_rate_limit_times + 1
-                                )
-
-                                logger.warn(
-                                    f"70分钟时间内切换媒体识别。 上一次触发时间为: {douban_last_ip_rate_limit_datetime}, 已触发次数: {douban_ip_rate_limit_times}"
-                                )
-
-                                douban_last_ip_rate_limit_datetime = (
-                                    datetime.datetime.now(
-                                        tz=pytz.timezone(settings.TZ)
-                                    )
-                                )
-
-                                logger.info(
-                                    f"切换识别 {title} 的媒体信息, 类型: {meta.type}"
-                                )
-                                logger.debug(
-                                    f"douban_last_ip_rate_limit_datetime:::{douban_last_ip_rate_limit_datetime}"
-                                )
-
-                                mediainfo = self.chain.recognize_media(
-                                    meta=meta,
-                                )
-                                if not mediainfo:
-                                    logger.warn(
-                                        f"未识别到 {title} 的媒体信息, 豆瓣ID {douban_id}"
-                                    )
-                                    # 存储历史记录
-                                    history_payload = DoubanRankPlus.__get_history_unrecognized_payload(
-                                        title, unique_flag, year
-                                    )
-                                    history.append(history_payload)
-                                    unique_flags.add(unique_flag)
-                                    logger.debug(
-                                        f"已添加到历史：{history_payload}"
-                                    )
-                                    continue
-                            else:
-                                # assert tmdbinfo is not None  # 类型断言
-                                tmdbinfo_media_type = tmdbinfo.get(  # type: ignore
-                                    "media_type", None
-                                )
-                                tmdb_id = tmdbinfo.get("id", None)  # type: ignore
-
-                                logger.debug(
-                                    f"从豆瓣ID {douban_id} 获得TMDB信息: TMDBID: {tmdb_id}, TMDBID Media Type: {tmdbinfo_media_type}"
-                                )
-
-                                if tmdbinfo_media_type:
-                                    mtype = tmdbinfo_media_type
-                                    meta.type = tmdbinfo_media_type
-
-                                logger.info(
-                                    f"继续通过TMDBID {tmdb_id} 识别 {title} 的媒体信息, 类型: {meta.type}"
-                                )
-                                mediainfo = self.chain.recognize_media(
-                                    meta=meta,
-                                    tmdbid=tmdb_id,
-                                    mtype=meta.type,  # 直接使用类型查询tmdb详情
-                                )
-
-                                if not mediainfo:
-                                    logger.warn(
-                                        f"未识别到 {title} 的媒体信息, TMDBID: {tmdb_id} "
-                                    )
-                                    # 存储历史记录
-                                    history_payload = DoubanRankPlus.__get_history_unrecognized_payload(
-                                        title, unique_flag, year, douban_id
-                                    )
-                                    history.append(history_payload)
-                                    unique_flags.add(unique_flag)
-                                    logger.debug(
-                                        f"已添加到历史：{history_payload}"
-                                    )
-                                    continue
-
-                        else:
-                            logger.info(
-                                f"开始通过豆瓣ID {douban_id} 识别 {title} 的媒体信息, 类型: {meta.type}"
-                            )
-                            mediainfo = self.chain.recognize_media(
-                                meta=meta,
-                                doubanid=douban_id,
-                            )
-                            if not mediainfo:
-                                logger.warn(
-                                    f"豆瓣ID {douban_id} 未识别到 {title} 的媒体信息"
-                                )
-                                # 存储历史记录
-                                history_payload = DoubanRankPlus.__get_history_unrecognized_payload(
-                                    title, unique_flag, year, douban_id
-                                )
-                                history.append(history_payload)
-                                unique_flags.add(unique_flag)
-                                logger.debug(
-                                    f"已添加到历史：{history_payload}"
-                                )
-                                continue
-
-                    else:
-                        # 识别媒体信息
-                        if douban_last_ip_rate_limit_datetime:
-                            logger.info(
-                                f"切换识别 {title} 的媒体信息, 类型: {meta.type}"
-                            )
-                        else:
-                            logger.info(
-                                f"开始识别 {title} 的媒体信息, 类型: {meta.type}"
-                            )
+        elif douban_id:
+            # 优先使用离线映射和已识别的TMDB信息
+            tmdbinfo = self.__get_local_tmdbinfo(
+                doubanid=douban_id, mtype=meta.type
+            )
+            if tmdbinfo:
+                mediainfo = self.__recognize_media_by_tmdbinfo(
+                    meta, title, douban_id, tmdbinfo
+                )
+            else:
+                logger.info(
+                    f"开始通过豆瓣ID {douban_id} 识别 {title} 的媒体信息, 类型: {meta.type}"
+                )
+                is_allowed, is_probe = self.douban_breaker.allow_request()
+                if is_allowed:
+                    try:
+                        self.__take_douban_budget()
+                        if not self.douban_limiter.acquire(self._event):
+                            logger.info("订阅服务停止")
+                            return False, None
                         mediainfo = self.chain.recognize_media(
                             meta=meta,
+                            doubanid=douban_id,
                         )
-                        if not mediainfo:
-                            logger.warn(
-                                f"未识别到 {title} 的媒体信息, 豆瓣ID: {douban_id}"
-                            )
-                            # 存储历史记录
-                            history_payload = DoubanRankPlus.__get_history_unrecognized_payload(
-                                title, unique_flag, year
-                            )
-                            history.append(history_payload)
-                            unique_flags.add(unique_flag)
-                            logger.debug(f"已添加到历史：{history_payload}")
-                            continue
-
-                    # logger.debug(f"{mediainfo}:::{mediainfo}")
-                    logger.debug(f"{meta}:::{meta}")
+                        if is_probe:
+                            self.douban_breaker.on_success()
+                    finally:
+                        if is_probe:
+                            self.douban_breaker.release()
+                elif self._is_exit_ip_rate_limit:
+                    logger.warn(
+                        f"豆瓣熔断中，未能从豆瓣获取数据, 豆瓣ID: {douban_id}, 熔断至: {self.douban_breaker.open_until}"
+                    )
+                    logger.info("结束处理")
+                    return False, None
+                else:
                     logger.info(
-                        f"已识别到 {title} ({year}) 的媒体信息: {mediainfo.title_year}, 类型: {mediainfo.type}"
+                        f"豆瓣熔断中，切换识别 {title} 的媒体信息, 类型: {meta.type}"
+                    )
+                    mediainfo = self.__recognize_media_by_title(meta, title)
+            if not mediainfo:
+                logger.warn(f"豆瓣ID {douban_id} 未识别到 {title} 的媒体信息")
+                # 存储历史记录
+                history_payload = (
+                    DoubanRankPlus.__get_history_unrecognized_payload(
+                        title, unique_flag, year, douban_id
                     )
+                )
+                self.__add_history(history_payload)
+                logger.debug(f"已添加到历史：{history_payload}")
+                return True, None
 
-                    if self._is_only_movies and mediainfo.type == MediaType.TV:
-                        logger.info(f"仅下载电影，跳过 {mediainfo.title_year}")
-                        continue
+        else:
+            # 识别媒体信息
+            logger.info(f"开始识别 {title} 的媒体信息, 类型: {meta.type}")
+            mediainfo = self.__recognize_media_by_title(meta, title)
+            if not mediainfo:
+                logger.warn(
+                    f"未识别到 {title} 的媒体信息, 豆瓣ID: {douban_id}"
+                )
+                # 存储历史记录
+                history_payload = (
+                    DoubanRankPlus.__get_history_unrecognized_payload(
+                        title, unique_flag, year
+                    )
+                )
+                self.__add_history(history_payload)
+                logger.debug(f"已添加到历史：{history_payload}")
+                return True, None
+
+        # logger.debug(f"{mediainfo}:::{mediainfo}")
+        logger.debug(f"{meta}:::{meta}")
+        logger.info(
+            f"已识别到 {title} ({year}) 的媒体信息: {mediainfo.title_year}, 类型: {mediainfo.type}"
+        )
+        return True, {
+            "work_item": work_item,
+            "meta": meta,
+            "mediainfo": mediainfo,
+        }
 
-                    if subscription_type:
-                        if (
-                            subscription_type == "movies"
-                            and mediainfo.type == MediaType.TV
-                        ):
-                            logger.info(
-                                f"仅下载电影，跳过 {mediainfo.title_year}"
-                            )
-                            continue
-                        if (
-                            subscription_type == "tv"
-                            and mediainfo.type == MediaType.MOVIE
-                        ):
-                            logger.info(
-                                f"仅下载剧集，跳过 {mediainfo.title_year}"
-                            )
-                            continue
+    def __recognize_media_by_tmdbinfo(
+        self,
+        meta: MetaBase,
+        title: str | None,
+        douban_id: str,
+        tmdbinfo: dict[str, Any],
+    ) -> MediaInfo | None:
+        """
+        按豆瓣ID对应的TMDB信息识别媒体信息
+        """
+        tmdbinfo_media_type = tmdbinfo.get("media_type", None)
+        tmdb_id = tmdbinfo.get("id", None)
 
-                    # 保存路径
-                    save_path = None
-                    if customize_save_paths and isinstance(
-                        customize_save_paths, dict
-                    ):
-                        if mediainfo.type == MediaType.TV:
-                            save_path = customize_save_paths.get("tv")
-                        elif mediainfo.type == MediaType.MOVIE:
-                            save_path = customize_save_paths.get("movie")
+        logger.debug(
+            f"从豆瓣ID {douban_id} 获得TMDB信息: TMDBID: {tmdb_id}, TMDBID Media Type: {tmdbinfo_media_type}"
+        )
 
-                    number_of_seasons = mediainfo.number_of_seasons
-                    logger.debug(f"number_of_seasons:::{number_of_seasons}")
+        if tmdbinfo_media_type:
+            meta.type = tmdbinfo_media_type
 
-                    # 已识别状态默认值
-                    status = Status.UNCATEGORIZED
+        logger.info(
+            f"继续通过TMDBID {tmdb_id} 识别 {title} 的媒体信息, 类型: {meta.type}"
+        )
+        mediainfo = self.chain.recognize_media(
+            meta=meta,
+            tmdbid=tmdb_id,
+            mtype=meta.type,  # 直接使用类型查询tmdb详情
+        )
+        if not mediainfo:
+            logger.warn(f"未识别到 {title} 的媒体信息, TMDBID: {tmdb_id} ")
+        return mediainfo
 
-                    # 查询缺失的媒体信息
-                    is_exist_all, missing_season = self.__check_lib_exists(
-                        meta, mediainfo, mediainfo.type == MediaType.MOVIE
-                    )
+    def __recognize_media_by_title(
+        self, meta: MetaBase, title: str | None
+    ) -> MediaInfo | None:
+        """
+        按标题和年份识别媒体信息，识别结果按 (标题, 年份, 类型) 缓存
+        只缓存识别成功的结果，未识别的条目按重试间隔重新识别
+        """
+        key = "|".join(
+            [
+                RE_WHITESPACE.sub("", title or "").lower(),
+                str(meta.year or ""),
+                meta.type.value if meta.type else "",
+            ]
+        )
+        cache = self.recognize_cache.get(key)
+        if cache:
+            logger.info(
+                f"使用 {title} 的识别缓存: TMDBID: {cache.get('tmdb_id')}"
+            )
+            mediainfo = MediaInfo()
+            for field in self._recognize_cache_fields:
+                setattr(mediainfo, field, cache.get(field))
+            mediainfo.type = MediaType(cache.get("type"))
+            # 保存后季的键为字符串
+            mediainfo.seasons = {
+                int(season): episodes
+                for season, episodes in (cache.get("seasons") or {}).items()
+            }
+            return mediainfo
 
-                    logger.debug(
-                        f"is_exist_all:::{is_exist_all}, missing_season:::{missing_season}"
-                    )
+        mediainfo = self.chain.recognize_media(meta=meta)
+        if mediainfo and mediainfo.tmdb_id and mediainfo.type:
+            cache = {
+                field: getattr(mediainfo, field, None)
+                for field in self._recognize_cache_fields
+            }
+            cache["type"] = mediainfo.type.value
+            self.recognize_cache.set(key, cache)
+        return mediainfo
+
+    def __subscribe_work_item(self, recognized_item: RecognizedItem):
+        """
+        检查媒体库和订阅，添加订阅并保存历史
+        """
+        work_item = recognized_item["work_item"]
+        meta = recognized_item["meta"]
+        mediainfo = recognized_item["mediainfo"]
+        rss_info = work_item["rss_info"]
+        title = rss_info.get("title")
+        douban_id = rss_info.get("doubanid")
+        unique_flag = work_item["unique_flags"][0]
+
+        if self._is_only_movies and mediainfo.type == MediaType.TV:
+            logger.info(f"仅下载电影，跳过 {mediainfo.title_year}")
+            return
+
+        # 合并各榜单的订阅类型，任一榜单允许该类型即订阅
+        options = [
+            option
+            for option in work_item["options"]
+            if not (
+                option.get("subscription_type") == "movies"
+                and mediainfo.type == MediaType.TV
+            )
+            and not (
+                option.get("subscription_type") == "tv"
+                and mediainfo.type == MediaType.MOVIE
+            )
+        ]
+        if not options:
+            if mediainfo.type == MediaType.TV:
+                logger.info(f"仅下载电影，跳过 {mediainfo.title_year}")
+            else:
+                logger.info(f"仅下载剧集，跳过 {mediainfo.title_year}")
+            return
+
+        # 保存路径，使用首个允许该类型的榜单的自定义保存路径
+        customize_save_paths = options[0].get("customize_save_paths")
+        save_path = None
+        if customize_save_paths and isinstance(customize_save_paths, dict):
+            if mediainfo.type == MediaType.TV:
+                save_path = customize_save_paths.get("tv")
+            elif mediainfo.type == MediaType.MOVIE:
+                save_path = customize_save_paths.get("movie")
+
+        number_of_seasons = mediainfo.number_of_seasons
+        logger.debug(f"number_of_seasons:::{number_of_seasons}")
+
+        # 已识别状态默认值
+        status = Status.UNCATEGORIZED
+
+        # 查询缺失的媒体信息
+        is_exist_all, missing_season = self.__check_lib_exists(
+            meta, mediainfo, mediainfo.type == MediaType.MOVIE
+        )
+
+        logger.debug(
+            f"is_exist_all:::{is_exist_all}, missing_season:::{missing_season}"
+        )
+
+        # 如果是剧集且开启全季订阅，则轮流下载每一季
+        if (
+            self._is_seasons_all
+            and mediainfo.type == MediaType.TV
+            and number_of_seasons
+            and not is_exist_all
+        ):
+            logger.debug(f"meta.begin_season:::{meta.begin_season}")
+            genre_ids = mediainfo.genre_ids
+            ANIME_GENRE_ID = 16
+            logger.debug(f"{mediainfo.title_year} genre_ids::: {genre_ids}")
+            if (
+                ANIME_GENRE_ID in genre_ids
+                and customize_save_paths
+                and isinstance(customize_save_paths, dict)
+            ):
+                save_path = customize_save_paths.get("anime")
+                logger.info(
+                    f"{mediainfo.title_year} 为动漫类别, 动漫自定义保存路径为: {save_path}"
+                )
+
+            status = self.__add_seasons_subscribe(
+                meta=meta,
+                mediainfo=mediainfo,
+                number_of_seasons=number_of_seasons,
+                save_path=save_path,
+                missing_season=missing_season,
+            )
+        else:
+            status = self.__checke_and_add_subscribe(
+                meta=meta,
+                mediainfo=mediainfo,
+                season=meta.begin_season,
+                save_path=save_path,
+                is_exist_all=is_exist_all,
+                missing_season=missing_season,
+            )
+
+        # 存储历史记录
+        history_payload = {
+            "title": title,
+            "type": mediainfo.type.value,
+            "year": mediainfo.year,
+            "poster": mediainfo.get_poster_image(),
+            "overview": mediainfo.overview,
+            "tmdbid": str(mediainfo.tmdb_id) or "0",
+            "doubanid": douban_id or "0",
+            "unique": unique_flag,
+            "time": datetime.datetime.now(
+                tz=pytz.timezone(settings.TZ)
+            ).strftime("%m-%d %H:%M"),
+            "time_full": datetime.datetime.now(
+                tz=pytz.timezone(settings.TZ)
+            ).strftime("%Y-%m-%d %H:%M:%S"),
+            "vote": mediainfo.vote_average,
+            "status": status.value,
+        }
+        self.__add_history(history_payload)
+        logger.debug(f"已添加到历史：{history_payload}")
+        return
+
+    @staticmethod
+    def __plan_work_items(
+        addr_results: List[Dict[str, Any]],
+        rss_infos_map: Dict[str, List[RssInfo]],
+    ) -> List[WorkItem]:
+        """
+        合并所有榜单的条目，按豆瓣ID去重，无豆瓣ID时按标题和年份去重
+        同一条目在多个榜单中出现时，合并各榜单的保存路径和订阅类型
+        :param addr_results: 按配置顺序排列的榜单地址解析结果
+        :param rss_infos_map: {地址: RSS条目}
+        :return: 按优先级从高到低排列的条目
+        """
+        work_items: Dict[str, WorkItem] = {}
+        feed_count = 0
+        for addr_result in addr_results:
+            addr = str(addr_result.get("addr"))
+            rss_infos = rss_infos_map.get(addr) or []
+            if not rss_infos:
+                logger.error(f"RSS地址：{addr} ，未查询到数据")
+                continue
+            logger.info(f"RSS地址：{addr} ，共 {len(rss_infos)} 条数据")
+            feed_count += 1
+
+            option: FeedOption = {
+                "addr": addr,
+                "customize_save_paths": addr_result.get(
+                    "customize_save_paths"
+                ),
+                "subscription_type": addr_result.get("subscription_type"),
+            }
+            for position, rss_info in enumerate(rss_infos):
+                title = rss_info.get("title")
+                if not title:
+                    logger.warn("标题为空，无法处理")
+                    continue
+                rank_ratio = position / len(rss_infos)
+                unique_flag = DoubanRankPlus.__get_unique_flag(rss_info)
+                key = DoubanRankPlus.__get_work_item_key(rss_info)
+
+                work_item = work_items.get(key)
+                if not work_item:
+                    work_items[key] = {
+                        "index": len(work_items),
+                        "key": key,
+                        "rss_info": rss_info,
+                        "unique_flags": [unique_flag],
+                        "options": [option],
+                        "rank_ratios": [rank_ratio],
+                        "priority": 0.0,
+                    }
+                    continue
+                if unique_flag not in work_item["unique_flags"]:
+                    work_item["unique_flags"].append(unique_flag)
+                if option not in work_item["options"]:
+                    work_item["options"].append(option)
+                    work_item["rank_ratios"].append(rank_ratio)
+
+        return DoubanRankPlus.__prioritize_work_items(
+            list(work_items.values()), feed_count
+        )
+
+    @staticmethod
+    def __get_unique_flag(rss_info: RssInfo) -> str:
+        """
+        历史记录唯一标识
+        """
+        return f"{DoubanRankPlus.plugin_config_prefix}{rss_info.get('title')}_{rss_info.get('year')}_(DB:{rss_info.get('doubanid')})"
+
+    @staticmethod
+    def __get_work_item_key(rss_info: RssInfo) -> str:
+        """
+        合并条目的键，按豆瓣ID合并，无豆瓣ID时按标题和年份合并
+        """
+        douban_id = rss_info.get("doubanid")
+        if douban_id:
+            return f"DB:{douban_id}"
+        title = RE_WHITESPACE.sub("", rss_info.get("title") or "").lower()
+        return f"{title}_{rss_info.get('year')}"
+
+    @staticmethod
+    def __get_feed_fingerprint(
+        rss_infos: List[RssInfo],
+    ) -> Tuple[str, List[str]]:
+        """
+        计算榜单内容指纹，只与条目集合有关，与排名顺序和评分无关
+        :return: 指纹，各条目摘要
+        """
+        item_hashes = sorted(
+            {
+                hashlib.sha1(
+                    "\n".join(
+                        str(rss_info.get(field) or "")
+                        for field in (
+                            "title",
+                            "link",
+                            "doubanid",
+                            "year",
+                            "mtype",
+                        )
+                    ).encode("utf-8")
+                ).hexdigest()[:16]
+                for rss_info in rss_infos
+            }
+        )
+        fingerprint = hashlib.sha1(
+            "\n".join(item_hashes).encode("utf-8")
+        ).hexdigest()
+        return fingerprint, item_hashes
+
+    def __get_feed_settings_digest(self) -> str:
+        """
+        影响条目处理结果的配置摘要，配置变化后所有榜单重新处理
+        """
+        return hashlib.sha1(
+            json.dumps(
+                [
+                    self._vote,
+                    str(self._release_year),
+                    self._is_seasons_all,
+                    self._is_only_movies,
+                ]
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def __check_feed_fingerprints(
+        self,
+        addr_results: Dict[str, Dict[str, Any]],
+        rss_infos_map: Dict[str, List[RssInfo]],
+    ) -> Tuple[Dict[str, FeedFingerprint], set[str]]:
+        """
+        对比上次完整运行时的榜单指纹，内容未变化且没有到期重试条目的榜单跳过
+        :param addr_results: {榜单配置: 榜单地址解析结果}
+        :return: 本次榜单指纹，跳过的榜单配置
+        """
+        stored = self.get_data("feed_fingerprints") or {}
+        previous: Dict[str, FeedFingerprint] = (
+            stored.get("feeds") or {}
+            if stored.get("settings") == self.__get_feed_settings_digest()
+            else {}
+        )
+        now = datetime.datetime.now(tz=pytz.timezone(settings.TZ)).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+        feed_fingerprints: Dict[str, FeedFingerprint] = {}
+        skipped_addrs: set[str] = set()
+        for _addr, addr_result in addr_results.items():
+            rss_infos = rss_infos_map.get(str(addr_result.get("addr"))) or []
+            if not rss_infos:
+                continue
+            fingerprint, item_hashes = DoubanRankPlus.__get_feed_fingerprint(
+                rss_infos
+            )
+            previous_fingerprint = previous.get(_addr)
+            if (
+                previous_fingerprint
+                and previous_fingerprint.get("fingerprint") == fingerprint
+                and (previous_fingerprint.get("next_retry") or "9999") > now
+            ):
+                skipped_addrs.add(_addr)
+                feed_fingerprints[_addr] = previous_fingerprint
+                continue
+            if previous_fingerprint and (
+                previous_fingerprint.get("fingerprint") == fingerprint
+            ):
+                logger.info(
+                    f"RSS地址：{addr_result.get('addr')} 有到期重试的未识别条目"
+                )
+            elif previous_fingerprint:
+                new_count = len(
+                    set(item_hashes)
+                    - set(previous_fingerprint.get("items") or [])
+                )
+                logger.info(
+                    f"RSS地址：{addr_result.get('addr')} 内容有变化，新增 {new_count} 条"
+                )
+            feed_fingerprints[_addr] = {
+                "fingerprint": fingerprint,
+                "items": item_hashes,
+                "next_retry": None,
+            }
+        if skipped_addrs:
+            logger.info(f"共 {len(skipped_addrs)} 个榜单内容未变化，跳过处理")
+        return feed_fingerprints, skipped_addrs
 
-                    # 如果是剧集且开启全季订阅，则轮流下载每一季
+    def __save_feed_fingerprints(
+        self,
+        feed_fingerprints: Dict[str, FeedFingerprint],
+        addr_results: Dict[str, Dict[str, Any]],
+        rss_infos_map: Dict[str, List[RssInfo]],
+        skipped_addrs: set[str],
+        work_items: List[WorkItem],
+    ):
+        """
+        保存榜单指纹，记录各榜单中未识别条目最早的重试时间，到期后重新处理该榜单
+        合并条目的历史记录只保存在其中一个唯一标识下，按合并条目查找历史记录
+        """
+        history_store = self.__get_history_store()
+        work_items_map = {
+            work_item["key"]: work_item for work_item in work_items
+        }
+        for _addr, feed_fingerprint in list(feed_fingerprints.items()):
+            if _addr in skipped_addrs:
+                continue
+            rss_infos = (
+                rss_infos_map.get(str(addr_results[_addr].get("addr"))) or []
+            )
+            # 有条目出错未完成的榜单下次运行重新处理
+            if any(
+                DoubanRankPlus.__get_work_item_key(rss_info)
+                in self._unfinished_keys
+                for rss_info in rss_infos
+            ):
+                logger.info(
+                    f"RSS地址：{addr_results[_addr].get('addr')} 有条目未处理完成，下次运行重新处理"
+                )
+                del feed_fingerprints[_addr]
+                continue
+            if not self._retry_limit:
+                continue
+            retry_times = []
+            for rss_info in rss_infos:
+                work_item = work_items_map.get(
+                    DoubanRankPlus.__get_work_item_key(rss_info)
+                )
+                unique_flags = (
+                    work_item["unique_flags"]
+                    if work_item
+                    else [DoubanRankPlus.__get_unique_flag(rss_info)]
+                )
+                for unique_flag in unique_flags:
+                    record = history_store.get(unique_flag)
                     if (
-                        self._is_seasons_all
-                        and mediainfo.type == MediaType.TV
-                        and number_of_seasons
-                        and not is_exist_all
+                        record
+                        and record.get("status") == Status.UNRECOGNIZED.value
                     ):
-                        logger.debug(
-                            f"meta.begin_season:::{meta.begin_season}"
-                        )
-                        genre_ids = mediainfo.genre_ids
-                        ANIME_GENRE_ID = 16
-                        logger.debug(
-                            f"{mediainfo.title_year} genre_ids::: {genre_ids}"
-                        )
-                        if (
-                            ANIME_GENRE_ID in genre_ids
-                            and customize_save_paths
-                            and isinstance(customize_save_paths, dict)
-                        ):
-                            save_path = customize_save_paths.get("anime")
-                            logger.info(
-                                f"{mediainfo.title_year} 为动漫类别, 动漫自定义保存路径为: {save_path}"
-                            )
+                        retry_times.append(str(record.get("next_retry") or ""))
+            feed_fingerprint["next_retry"] = (
+                min(retry_times) if retry_times else None
+            )
+        self.save_data(
+            "feed_fingerprints",
+            {
+                "settings": self.__get_feed_settings_digest(),
+                "feeds": feed_fingerprints,
+            },
+        )
 
-                        for i in range(1, number_of_seasons + 1):
-                            logger.debug(
-                                f"开始添加 {mediainfo.title_year} 第{i}/{number_of_seasons}季订阅"
-                            )
-                            __status = self.__checke_and_add_subscribe(
-                                meta=meta,
-                                mediainfo=mediainfo,
-                                season=i,
-                                save_path=save_path,
-                                is_exist_all=is_exist_all,
-                                missing_season=missing_season,
-                            )
-                            if not meta.begin_season or i == meta.begin_season:
-                                status = __status
-                    else:
-                        status = self.__checke_and_add_subscribe(
-                            meta=meta,
-                            mediainfo=mediainfo,
-                            season=meta.begin_season,
-                            save_path=save_path,
-                            is_exist_all=is_exist_all,
-                            missing_season=missing_season,
-                        )
+    def __clear_feed_fingerprints(self):
+        """
+        清除榜单指纹，下次运行处理所有榜单
+        """
+        self.del_data("feed_fingerprints")
 
-                    # 存储历史记录
-                    history_payload = {
-                        "title": title,
-                        "type": mediainfo.type.value,
-                        "year": mediainfo.year,
-                        "poster": mediainfo.get_poster_image(),
-                        "overview": mediainfo.overview,
-                        "tmdbid": str(mediainfo.tmdb_id) or "0",
-                        "doubanid": douban_id or "0",
-                        "unique": unique_flag,
-                        "time": datetime.datetime.now(
-                            tz=pytz.timezone(settings.TZ)
-                        ).strftime("%m-%d %H:%M"),
-                        "time_full": datetime.datetime.now(
-                            tz=pytz.timezone(settings.TZ)
-                        ).strftime("%Y-%m-%d %H:%M:%S"),
-                        "vote": mediainfo.vote_average,
-                        "status": status.value,
-                    }
-                    history.append(history_payload)
-                    unique_flags.add(unique_flag)
-                    logger.debug(f"已添加到历史：{history_payload}")
+    @staticmethod
+    def __prioritize_work_items(
+        work_items: List[WorkItem], feed_count: int
+    ) -> List[WorkItem]:
+        """
+        按优先级对所有榜单的条目统一排序，优先处理排名靠前、出现在多个榜单、评分高的条目
+        :param work_items: 按首次出现顺序排列的条目
+        :param feed_count: 有数据的榜单数量
+        :return: 按优先级从高到低排列的条目，序号按新顺序重新编号
+        """
+        weights = DoubanRankPlus._priority_weights
+        for work_item in work_items:
+            rank_score = 1 - min(work_item["rank_ratios"])
+            feeds_score = (len(work_item["rank_ratios"]) - 1) / max(
+                feed_count - 1, 1
+            )
+            rating = work_item["rss_info"].get("rating") or 0
+            work_item["priority"] = round(
+                weights["rank"] * rank_score
+                + weights["feeds"] * feeds_score
+                + weights["rating"] * min(float(rating), 10) / 10,
+                4,
+            )
 
-            except Exception as e:
-                logger.error(f"处理RSS地址：{addr} 出错: {str(e)}")
-            finally:
-                # 保存历史记录
-                logger.info(f"保存榜单 {addr} 处理后的历史记录")
+        # 优先级相同时保持首次出现的顺序
+        work_items = sorted(
+            work_items, key=lambda work_item: -work_item["priority"]
+        )
+        for index, work_item in enumerate(work_items):
+            work_item["index"] = index
+        return work_items
 
-                self.save_data("history", history)
+    def __get_history_store(self) -> HistoryStore:
+        """
+        获取历史记录索引，首次使用时从插件数据和追加日志中加载
+        """
+        with self._history_store_lock:
+            if self._history_store is None:
+                history: List[HistoryPayload] = self.get_data("history") or []
+                # 合并中断时可能存在重复记录，后添加的记录会替换之前的记录
+                self._history_store = HistoryStore(
+                    history + self.history_journal.read()
+                )
+            return self._history_store
 
-        logger.info("所有榜单RSS刷新完成")
+    def __add_history(self, history_payload: HistoryPayload):
+        """
+        添加历史记录，并追加写入日志
+        未识别的记录累加识别次数，并按识别次数计算下次重试时间
+        """
+        with self._history_write_lock:
+            history_store = self.__get_history_store()
+            if history_payload.get("status") == Status.UNRECOGNIZED.value:
+                previous = history_store.get(history_payload["unique"])
+                attempts = (
+                    int(previous.get("attempts") or 1)
+                    if previous
+                    and previous.get("status") == Status.UNRECOGNIZED.value
+                    else 0
+                ) + 1
+                retry_seconds = min(
+                    self._retry_max_seconds,
+                    self._retry_base_seconds * 2 ** (attempts - 1),
+                )
+                history_payload["attempts"] = attempts
+                history_payload["next_retry"] = (
+                    datetime.datetime.now(tz=pytz.timezone(settings.TZ))
+                    + datetime.timedelta(seconds=retry_seconds)
+                ).strftime("%Y-%m-%d %H:%M:%S")
+            history_store.add(history_payload)
+            self.history_journal.append([history_payload])
+
+    def __get_retry_indexes(
+        self, work_items: List[WorkItem], history_store: HistoryStore
+    ) -> set[int]:
+        """
+        获取本次需要重试的未识别条目，按优先级最多取 retry_limit 个到期的条目
+        只重试仍在榜单中的条目；没有重试时间的旧记录视为已到期
+        """
+        if not self._retry_limit:
+            return set()
+        now = datetime.datetime.now(tz=pytz.timezone(settings.TZ)).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+        retry_indexes: set[int] = set()
+        due_count = 0
+        for work_item in work_items:
+            records = [
+                history_store.get(unique_flag)
+                for unique_flag in work_item["unique_flags"]
+                if unique_flag in history_store
+            ]
+            if not records or not all(
+                record
+                and record.get("status") == Status.UNRECOGNIZED.value
+                and str(record.get("next_retry") or "") <= now
+                for record in records
+            ):
+                continue
+            due_count += 1
+            if len(retry_indexes) >= self._retry_limit:
+                continue
+            retry_indexes.add(work_item["index"])
+            # 重试时不使用未匹配的识别缓存
+            douban_id = work_item["rss_info"].get("doubanid")
+            if douban_id:
+                self.tmdb_index_missed.delete(douban_id)
+        if retry_indexes:
+            logger.info(
+                f"共 {due_count} 个未识别条目到期重试, 本次重试 {len(retry_indexes)} 个"
+            )
+        return retry_indexes
+
+    def __save_history(self):
+        """
+        保存完整历史记录，并清空追加日志
+        """
+        with self._history_write_lock:
+            self.save_data("history", self.__get_history_store().records())
+            self.history_journal.clear()
+
+    def __save_caches(self):
+        """
+        保存限速状态和识别缓存
+        """
+        self.save_data("douban_limiter", self.douban_limiter.get_state())
+        self.save_data("douban_breaker", self.douban_breaker.get_state())
+        with self._deferred_lock:
+            self.save_data(
+                "deferred_items", list(self._deferred_items.values())
+            )
+        if self.douban_cache.dirty:
+            self.save_data("douban_cache", self.douban_cache.to_dict())
+        if self.recognize_cache.dirty:
+            self.save_data("recognize_cache", self.recognize_cache.to_dict())
+        if self.tmdb_index.dirty or self.tmdb_index_missed.dirty:
+            self.__save_tmdb_index()
+
+    def __take_douban_budget(self):
+        """
+        占用一次本次运行的豆瓣请求次数
+        :raises DoubanBudgetExceeded: 已达到上限
+        """
+        with self._douban_budget_lock:
+            if (
+                self._douban_budget
+                and self._douban_requests >= self._douban_budget
+            ):
+                raise DoubanBudgetExceeded()
+            self._douban_requests += 1
+
+    def __defer_work_item(self, work_item: WorkItem):
+        """
+        将条目加入延后处理队列，下次运行优先处理
+        """
+        logger.info(
+            f"本次运行豆瓣请求已达上限 {self._douban_budget} 次，{work_item['rss_info'].get('title')} 延后到下次运行处理"
+        )
+        with self._deferred_lock:
+            self._deferred_items[work_item["key"]] = work_item
+
+    def __get_deferred_items(
+        self, history_store: HistoryStore
+    ) -> List[WorkItem]:
+        """
+        获取延后处理的条目，已在历史记录中的条目移出队列
+        延后的条目不属于本次计划，序号为-1，不影响检查点的处理进度
+        """
+        with self._deferred_lock:
+            for key, work_item in list(self._deferred_items.items()):
+                if any(
+                    unique_flag in history_store
+                    for unique_flag in work_item["unique_flags"]
+                ):
+                    del self._deferred_items[key]
+            return [
+                {**work_item, "index": -1}
+                for work_item in self._deferred_items.values()
+            ]
+
+    @staticmethod
+    def __get_plan_signature(work_items: List[WorkItem]) -> str:
+        """
+        计算计划签名，榜单条目及其顺序不变时签名不变
+        """
+        return hashlib.sha1(
+            "\n".join(work_item["key"] for work_item in work_items).encode(
+                "utf-8"
+            )
+        ).hexdigest()
+
+    def __restore_checkpoint(self, signature: str) -> int:
+        """
+        恢复上次运行的检查点
+        :return: 计划签名一致时返回上次处理到的位置，否则为0
+        """
+        checkpoint: RunCheckpoint | None = self.get_data("checkpoint")
+        if not checkpoint:
+            return 0
+
+        # 限速和熔断状态与计划无关，始终恢复
+        self.douban_limiter.set_state(checkpoint.get("limiter"))
+        self.douban_breaker.set_state(checkpoint.get("douban_breaker"))
+
+        if checkpoint.get("signature") != signature:
+            logger.info("榜单条目已变化，重新开始处理")
+            return 0
+        watermark = int(checkpoint.get("watermark") or 0)
+        logger.info(
+            f"从上次中断处继续处理, 上次保存时间: {checkpoint.get('time_full')}, 跳过前 {watermark} 个条目"
+        )
+        return watermark
+
+    def __save_checkpoint(self, is_completed: bool = False):
+        """
+        保存检查点：合并历史记录追加日志，保存限速状态、识别缓存和处理进度
+        :param is_completed: 是否已处理完所有条目，完成后清除检查点
+        """
+        if self.history_journal.size() >= self._history_compact_size:
+            logger.info("合并历史记录追加日志")
+            self.__save_history()
+        self.__save_caches()
+
+        if is_completed or not self._plan_signature:
+            self.del_data("checkpoint")
+            return
+        checkpoint: RunCheckpoint = {
+            "signature": self._plan_signature,
+            "watermark": (
+                self._plan_watermark.value if self._plan_watermark else 0
+            ),
+            "limiter": self.douban_limiter.get_state(),
+            "douban_breaker": self.douban_breaker.get_state(),
+            "time_full": datetime.datetime.now(
+                tz=pytz.timezone(settings.TZ)
+            ).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.save_data("checkpoint", checkpoint)
+
+    def __load_tmdb_mapping(self):
+        """
+        加载离线豆瓣ID映射，替换后关闭已加载的映射
+        """
+        old_mapping = self.tmdb_mapping
+        self.tmdb_mapping = DoubanTmdbMapping(self.__get_tmdb_mapping_path())
+        if old_mapping:
+            old_mapping.close()
+
+    def __get_tmdb_mapping_path(self) -> Path:
+        """
+        离线豆瓣ID映射文件路径
+        """
+        return self.get_data_path() / "douban_tmdb_mapping.bin"
+
+    def __save_tmdb_index(self):
+        """
+        保存豆瓣ID对应的TMDB识别结果
+        """
+        self.save_data(
+            "tmdb_index",
+            {
+                "found": self.tmdb_index.to_dict(),
+                "missed": self.tmdb_index_missed.to_dict(),
+            },
+        )
+
+    def __load_subscription_index(self) -> SubscriptionIndex | None:
+        """
+        加载所有订阅的索引，加载失败时实时查询订阅
+        """
+        try:
+            return SubscriptionIndex(SubscribeOper().list())
+        except Exception as e:
+            logger.error(f"加载订阅出错，实时查询订阅: {str(e)}")
+            return None
+
+    def __load_library_snapshot(self) -> LibrarySnapshot | None:
+        """
+        获取所有媒体服务器的媒体库快照，获取失败时实时查询媒体库
+        """
+        start_time = time.time()
+        try:
+            mediaservers = MediaServerHelper().get_services()
+            if not mediaservers:
+                logger.info("未获取到媒体服务器，实时查询媒体库")
+                return None
+            library_snapshot = LibrarySnapshot(
+                self.mediaserverchain, mediaservers.keys()
+            )
+        except Exception as e:
+            logger.error(f"获取媒体库快照出错，实时查询媒体库: {str(e)}")
+            return None
+        logger.info(
+            f"已获取 {len(mediaservers)} 个媒体服务器的媒体库快照, 共 {library_snapshot.item_count} 个条目, 耗时 {time.time() - start_time:.2f} 秒"
+        )
+        return library_snapshot
 
     def __check_lib_exists(
         self,
@@ -1775,6 +3958,21 @@ class DoubanRankPlus(_PluginBase):
         检查媒体库缺失
         @return: True: 媒体库中已存在 False: 媒体库中不存在; list[int]: 缺失的季
         """
+        # 优先从媒体库快照判断
+        if self._library_snapshot:
+            snapshot_result = self._library_snapshot.no_exists_seasons(
+                meta, mediainfo
+            )
+            if snapshot_result is not None:
+                is_exist_all, missing_seasons = snapshot_result
+                logger.debug(
+                    f"媒体库快照: {mediainfo.title_year} 是否存在: {is_exist_all}, 缺失季: {missing_seasons}"
+                )
+                if is_exist_all:
+                    logger.info(f"{mediainfo.title_year} 媒体库中已存在")
+                    return True, None
+                return False, missing_seasons or None
+
         # 查询缺失的媒体信息
         is_exist_flag, no_exist_details = (
             self.downloadchain.get_no_exists_info(
@@ -1862,12 +4060,12 @@ class DoubanRankPlus(_PluginBase):
         #     return Status.MEDIA_EXISTS
 
         # 判断用户是否已经添加订阅
-        if self.subscribechain.exists(mediainfo=mediainfo, meta=meta):
+        if self.__subscribe_exists(mediainfo=mediainfo, meta=meta):
             logger.info(f"{mediainfo.title_year} 订阅已存在")
             return Status.SUBSCRIPTION_EXISTS
 
         # 添加订阅
-        self.subscribechain.add(
+        sid, _msg = self.subscribechain.add(
             title=mediainfo.title,
             year=mediainfo.year,
             mtype=mediainfo.type,
@@ -1877,93 +4075,358 @@ class DoubanRankPlus(_PluginBase):
             username=self.plugin_name,
             save_path=save_path,
         )
+        if sid and self._subscription_index:
+            self._subscription_index.add(
+                tmdbid=mediainfo.tmdb_id,
+                doubanid=mediainfo.douban_id,
+                season=season,
+            )
         if season:
             logger.info(f"已添加订阅: {mediainfo.title_year} 第 {season} 季")
         else:
             logger.info(f"已添加订阅: {mediainfo.title_year} ")
         return Status.SUBSCRIPTION_ADDED
 
+    def __add_seasons_subscribe(
+        self,
+        meta: MetaBase,
+        mediainfo: MediaInfo,
+        number_of_seasons: int,
+        save_path,
+        missing_season: list[int] | None,
+    ) -> Status:
+        """
+        全季订阅：只判断一次上映年份和评分，按缺失季和已订阅季计算需要订阅的季后逐季添加
+        :return: 起始季的状态，未指定起始季时为最后一季的状态
+        """
+        logger.debug(
+            f"开始添加 {mediainfo.title_year} 共 {number_of_seasons} 季订阅"
+        )
+        if save_path:
+            logger.info(
+                f"{mediainfo.title_year} 的自定义保存路径为: {save_path}"
+            )
+
+        # 判断上映年份是否符合要求
+        if self._release_year and int(mediainfo.year) < int(
+            self._release_year
+        ):
+            logger.info(
+                f"{mediainfo.title_year} 上映年份: {mediainfo.year}, 不符合要求"
+            )
+            return Status.YEAR_NOT_MATCH
+        # 判断评分是否符合要求
+        if self._vote and mediainfo.vote_average < self._vote:
+            logger.info(
+                f"{mediainfo.title_year} 评分: {mediainfo.vote_average}, 不符合要求"
+            )
+            return Status.RATING_NOT_MATCH
+
+        all_seasons = set(range(1, number_of_seasons + 1))
+        missing_seasons = (
+            all_seasons & set(missing_season)
+            if missing_season
+            else all_seasons
+        )
+        subscribed_seasons = {
+            season
+            for season in missing_seasons
+            if self.__season_subscribe_exists(mediainfo, season)
+        }
+        add_seasons = sorted(missing_seasons - subscribed_seasons)
+        if all_seasons - missing_seasons:
+            logger.info(
+                f"{mediainfo.title_year} 第 {', '.join(map(str, sorted(all_seasons - missing_seasons)))} 季媒体库中已存在，跳过订阅"
+            )
+        if subscribed_seasons:
+            logger.info(
+                f"{mediainfo.title_year} 第 {', '.join(map(str, sorted(subscribed_seasons)))} 季订阅已存在"
+            )
+
+        for season in add_seasons:
+            sid, _msg = self.subscribechain.add(
+                title=mediainfo.title,
+                year=mediainfo.year,
+                mtype=mediainfo.type,
+                tmdbid=mediainfo.tmdb_id,
+                season=season,
+                exist_ok=True,
+                username=self.plugin_name,
+                save_path=save_path,
+            )
+            if sid and self._subscription_index:
+                self._subscription_index.add(
+                    tmdbid=mediainfo.tmdb_id,
+                    doubanid=mediainfo.douban_id,
+                    season=season,
+                )
+        if add_seasons:
+            logger.info(
+                f"已添加订阅: {mediainfo.title_year} 第 {', '.join(map(str, add_seasons))} 季"
+            )
+
+        status_season = meta.begin_season or number_of_seasons
+        if status_season not in all_seasons:
+            return Status.UNCATEGORIZED
+        if status_season not in missing_seasons:
+            return Status.MEDIA_EXISTS
+        if status_season in subscribed_seasons:
+            return Status.SUBSCRIPTION_EXISTS
+        return Status.SUBSCRIPTION_ADDED
+
+    def __season_subscribe_exists(
+        self, mediainfo: MediaInfo, season: int
+    ) -> bool:
+        """
+        判断某一季的订阅是否存在，优先使用本次运行的订阅索引
+        """
+        if self._subscription_index is None:
+            return bool(
+                SubscribeOper().exists(
+                    tmdbid=mediainfo.tmdb_id,
+                    doubanid=mediainfo.douban_id,
+                    season=season,
+                )
+            )
+        return self._subscription_index.exists(
+            tmdbid=mediainfo.tmdb_id,
+            doubanid=mediainfo.douban_id,
+            season=season,
+        )
+
+    def __subscribe_exists(self, mediainfo: MediaInfo, meta: MetaBase) -> bool:
+        """
+        判断订阅是否存在，优先使用本次运行的订阅索引
+        """
+        if self._subscription_index is None:
+            return bool(
+                self.subscribechain.exists(mediainfo=mediainfo, meta=meta)
+            )
+        return self._subscription_index.exists(
+            tmdbid=mediainfo.tmdb_id,
+            doubanid=mediainfo.douban_id,
+            season=meta.begin_season if meta else None,
+        )
+
+    def __prefetch_rss_infos(
+        self, addrs: List[str]
+    ) -> Dict[str, List[RssInfo]]:
+        """
+        并发获取所有榜单RSS，同一主机限制并发数
+        :param addrs: 榜单RSS地址
+        :return: {地址: RSS条目}
+        """
+        addrs = list(dict.fromkeys(addrs))
+        if not addrs:
+            return {}
+
+        host_semaphores: Dict[str, Semaphore] = {}
+        for addr in addrs:
+            host = urlparse(addr).netloc
+            if host not in host_semaphores:
+                host_semaphores[host] = Semaphore(self._fetch_per_host)
+
+        def __fetch(addr: str) -> List[RssInfo]:
+            with host_semaphores[urlparse(addr).netloc]:
+                if self._event.is_set():
+                    return []
+                logger.info(f"获取RSS：{addr} ...")
+                return self.__get_rss_info(addr)
+
+        rss_infos_map: Dict[str, List[RssInfo]] = {}
+        start_time = time.time()
+        with ThreadPoolExecutor(
+            max_workers=min(self._fetch_workers, len(addrs)),
+            thread_name_prefix=f"{self._plugin_id}-fetch",
+        ) as executor:
+            futures = {executor.submit(__fetch, addr): addr for addr in addrs}
+            for future in as_completed(futures):
+                addr = futures[future]
+                try:
+                    rss_infos_map[addr] = future.result()
+                except Exception as e:
+                    logger.error(f"获取RSS：{addr} 出错: {str(e)}")
+                    rss_infos_map[addr] = []
+
+        logger.info(
+            f"共获取 {len(addrs)} 个榜单RSS, 耗时 {round(time.time() - start_time, 1)} 秒"
+        )
+        self.__save_feed_cache(addrs)
+        return rss_infos_map
+
+    def __get_feed_cache(self, addr: str) -> FeedCache | None:
+        """
+        获取榜单RSS缓存
+        """
+        with self._feed_cache_lock:
+            if self._feed_cache is None:
+                self._feed_cache = self.get_data("feed_cache") or {}
+            return self._feed_cache.get(addr)
+
+    def __set_feed_cache(
+        self, addr: str, res: Any, rss_infos: List[RssInfo]
+    ) -> None:
+        """
+        记录榜单RSS的校验头和解析结果，没有校验头时不缓存
+        """
+        etag = res.headers.get("ETag")
+        last_modified = res.headers.get("Last-Modified")
+        with self._feed_cache_lock:
+            if self._feed_cache is None:
+                self._feed_cache = self.get_data("feed_cache") or {}
+            if not etag and not last_modified:
+                self._feed_cache.pop(addr, None)
+                return
+            self._feed_cache[addr] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "rss_infos": rss_infos,
+                "time_full": datetime.datetime.now(
+                    tz=pytz.timezone(settings.TZ)
+                ).strftime("%Y-%m-%d %H:%M:%S"),
+            }
+
+    def __save_feed_cache(self, addrs: List[str]) -> None:
+        """
+        保存榜单RSS缓存，移除已不在榜单中的地址
+        """
+        with self._feed_cache_lock:
+            if self._feed_cache is None:
+                return
+            self._feed_cache = {
+                addr: cache
+                for addr, cache in self._feed_cache.items()
+                if addr in addrs
+            }
+            self.save_data("feed_cache", self._feed_cache)
+
     def __get_rss_info(self, addr) -> List[RssInfo]:
         """
         获取RSS
         """
         try:
+            # 条件请求
+            headers = {"User-Agent": settings.USER_AGENT}
+            feed_cache = self.__get_feed_cache(addr)
+            if feed_cache:
+                if feed_cache.get("etag"):
+                    headers["If-None-Match"] = str(feed_cache.get("etag"))
+                if feed_cache.get("last_modified"):
+                    headers["If-Modified-Since"] = str(
+                        feed_cache.get("last_modified")
+                    )
+
             if self._proxy:
                 ret = RequestUtils(
-                    timeout=240, proxies=settings.PROXY or {}
+                    headers=headers,
+                    timeout=240,
+                    proxies=settings.PROXY or {},
+                    session=self._session,
                 ).get_res(addr)
             else:
-                ret = RequestUtils(timeout=240).get_res(addr)
+                ret = RequestUtils(
+                    headers=headers, timeout=240, session=self._session
+                ).get_res(addr)
             if not ret:
                 return []
-            ret_xml = ret.text
-            ret_array: List[RssInfo] = []
+            if ret.status_code == 304 and feed_cache:
+                logger.info(
+                    f"RSS地址：{addr} 未变化，使用 {feed_cache.get('time_full')} 的缓存"
+                )
+                return feed_cache.get("rss_infos") or []
+            # 流式解析XML，需要完整解析后才能合并所有榜单的条目
+            # 解析出错时不使用已解析的部分条目，也不更新缓存
+            ret_array: List[RssInfo] = list(
+                DoubanRankPlus.__iter_rss_info(
+                    ret.iter_content(chunk_size=64 * 1024)
+                )
+            )
+            self.__set_feed_cache(addr, ret, ret_array)
+            return ret_array
+        except ParseError as e:
+            logger.error(f"解析RSS失败：{addr}，{str(e)}")
+            return []
+        except Exception as e:
+            logger.error("获取RSS失败：" + str(e))
+            return []
 
-            # 解析XML
-            dom_tree = xml.dom.minidom.parseString(ret_xml)
-            rootNode = dom_tree.documentElement
-            if rootNode is None:
-                return []
-            items = rootNode.getElementsByTagName("item")
-            for item in items:
-                try:
-                    # 标题
-                    title = DomUtils.tag_value(item, "title", default="")
-                    # 链接
-                    link = DomUtils.tag_value(item, "link", default="")
-                    if not title and not link:
-                        logger.warn("条目标题和链接均为空，无法处理")
-                        continue
+    @staticmethod
+    def __iter_rss_info(chunks: Iterable[bytes]) -> Iterator[RssInfo]:
+        """
+        流式解析RSS，每解析完一个条目即返回，无需等待整个文档解析完成
+        :param chunks: RSS内容分块
+        :return: RSS条目
+        :raises ParseError: RSS格式错误或内容不完整
+        """
 
-                    # 豆瓣ID
-                    found_doubanid = re.findall(r"/(\d+)/", str(link) or "")
-                    if found_doubanid:
-                        doubanid = found_doubanid[0]
-                        if not str(doubanid).isdigit():
-                            logger.warn(f"解析的豆瓣ID格式不正确：{doubanid}")
-                            continue
-                    else:
-                        doubanid = None
-
-                    # 年份
-                    year = DomUtils.tag_value(item, "year", default="")
-                    if not year:
-                        # 年份
-                        description = DomUtils.tag_value(
-                            item, "description", default=""
-                        )
-                        # 删除 '评价数' 到第一个 '<br>' 之间的字符串
-                        description = re.sub(
-                            r"评价数.*?<br>", "", str(description) or ""
-                        )
-                        # 删除所有 <img> 标签及其内容
-                        description = re.sub(r"<img.*?>", "", description)
-                        # 匹配4位独立数字1900-2099年
-                        found_year = re.findall(
-                            r"\b(19\d{2}|20\d{2})\b", description
-                        )
-                        year = found_year[0] if found_year else None
+        def __tag_name(element: Element) -> str:
+            # 去掉命名空间
+            return element.tag.rsplit("}", 1)[-1]
+
+        def __parse_item(item: Element) -> RssInfo | None:
+            values: Dict[str, str] = {}
+            for child in item:
+                name = __tag_name(child)
+                if name not in values:
+                    values[name] = child.text or ""
+
+            # 标题
+            title = values.get("title", "")
+            # 链接
+            link = values.get("link", "")
+            if not title and not link:
+                logger.warn("条目标题和链接均为空，无法处理")
+                return None
 
-                    # 类型
-                    mtype = DomUtils.tag_value(item, "type", default="")
+            # 豆瓣ID
+            found_doubanid = RE_DOUBANID.search(link)
+            doubanid = found_doubanid.group(1) if found_doubanid else None
 
-                    rss_info: RssInfo = {
-                        "title": str(title),
-                        "link": str(link),
-                        "mtype": str(mtype),
-                        "year": str(year) if year else None,
-                        "doubanid": str(doubanid) if doubanid else None,
-                    }
-                    # 返回对象
-                    ret_array.append(rss_info)
+            description = values.get("description", "")
+
+            # 评分
+            found_rating = RE_DESCRIPTION_RATING.search(description)
+            rating = float(found_rating.group(1)) if found_rating else None
+
+            # 年份
+            year = values.get("year", "")
+            if not year:
+                # 删除 '评价数' 到第一个 '<br>' 之间的字符串
+                description = RE_DESCRIPTION_RATING_COUNT.sub("", description)
+                # 删除所有 <img> 标签及其内容
+                description = RE_DESCRIPTION_IMG.sub("", description)
+                # 匹配4位独立数字1900-2099年
+                found_year = RE_YEAR.search(description)
+                year = found_year.group(1) if found_year else None
+
+            # 类型
+            mtype = values.get("type", "")
+
+            return {
+                "title": title,
+                "link": link,
+                "mtype": mtype,
+                "year": year or None,
+                "doubanid": doubanid,
+                "rating": rating,
+            }
 
+        parser = XMLPullParser(events=("end",))
+        for chunk in chunks:
+            parser.feed(chunk)
+            for _event, element in parser.read_events():
+                if __tag_name(element) != "item":
+                    continue
+                try:
+                    rss_info = __parse_item(element)
+                    if rss_info:
+                        yield rss_info
                 except Exception as e1:
                     logger.error("解析RSS条目失败：" + str(e1))
-                    continue
-            return ret_array
-        except Exception as e:
-            logger.error("获取RSS失败：" + str(e))
-            return []
+                finally:
+                    # 释放已解析条目
+                    element.clear()
+        parser.close()
 
     @staticmethod
     def __get_info_addr(
@@ -2073,12 +4536,61 @@ class DoubanRankPlus(_PluginBase):
         }
         return history_payload
 
+    def __get_local_tmdbinfo(
+        self, doubanid: str, mtype: MediaType | None = None
+    ) -> dict[str, Any] | None:
+        """
+        从离线映射和识别缓存获取豆瓣ID对应的TMDB信息，不发起网络请求
+        """
+        # 优先使用离线导入的映射
+        mapped = self.tmdb_mapping.get(doubanid) if self.tmdb_mapping else None
+        if mapped:
+            tmdbid, mapped_type = mapped
+            mapped_type = mapped_type or (
+                mtype if mtype != MediaType.UNKNOWN else None
+            )
+            if mapped_type:
+                logger.info(
+                    f"使用豆瓣ID {doubanid} 的离线映射: TMDBID: {tmdbid}"
+                )
+                return {
+                    "id": tmdbid,
+                    "media_type": mapped_type,
+                    "season": None,
+                }
+            # 类型未知时无法按TMDBID查询详情
+            logger.debug(f"豆瓣ID {doubanid} 的离线映射未记录类型，跳过")
+
+        # 其次使用已识别的结果
+        index = self.tmdb_index.get(doubanid)
+        if index:
+            logger.info(
+                f"使用豆瓣ID {doubanid} 的TMDB识别缓存: TMDBID: {index.get('id')}"
+            )
+            return {
+                "id": index.get("id"),
+                "media_type": (
+                    MediaType(index.get("media_type"))
+                    if index.get("media_type")
+                    else None
+                ),
+                "season": index.get("season"),
+            }
+        return None
+
     def __get_tmdbinfo_by_doubanid(
         self, doubanid: str, mtype: MediaType | None = None
     ) -> Tuple[dict[str, Any] | None, bool]:
         """
         根据豆瓣ID获取TMDB信息
         """
+        tmdbinfo = self.__get_local_tmdbinfo(doubanid=doubanid, mtype=mtype)
+        if tmdbinfo:
+            return tmdbinfo, False
+        if self.tmdb_index_missed.get(doubanid):
+            logger.info(f"豆瓣ID {doubanid} 近期未匹配到TMDB信息，跳过匹配")
+            return None, False
+
         doubaninfo, is_ip_rate_limit = self.__douban_info(
             doubanid=doubanid, mtype=mtype
         )
@@ -2128,6 +4640,8 @@ class DoubanRankPlus(_PluginBase):
         __begin_season = meta.begin_season if meta.begin_season else None
         __is_match_season_from_name = False
 
+        # 按优先级生成候选名称和季数
+        candidates: List[Tuple[str, int | None]] = []
         for name in meta_names:
             if __is_match_season_from_name:
                 # 如果已经从名字匹配到季数，则直接修正名字
@@ -2146,25 +4660,82 @@ class DoubanRankPlus(_PluginBase):
                     ).strip()  # 将匹配到的数字从 name 中移除，并去掉多余的空格
                     __is_match_season_from_name = True
                     logger.debug("从名字匹配到季数：%s", __begin_season)
+            candidates.append((name, __begin_season))
 
+        tmdbinfo = self.__match_tmdbinfo(
+            candidates, year=meta.year, mtype=__mtype
+        )
+        if tmdbinfo:
+            # 合季季后返回
+            tmdbinfo["season"] = meta.begin_season
+            tmdbinfo_media_type = tmdbinfo.get("media_type")
+            self.tmdb_index.set(
+                doubanid,
+                {
+                    "id": tmdbinfo.get("id"),
+                    "media_type": (
+                        tmdbinfo_media_type.value
+                        if isinstance(tmdbinfo_media_type, MediaType)
+                        else None
+                    ),
+                    "season": meta.begin_season,
+                },
+            )
+            return tmdbinfo, is_ip_rate_limit
+
+        if not self._event.is_set():
+            # 记录确认未匹配的豆瓣ID
+            self.tmdb_index_missed.set(doubanid, True)
+        return None, is_ip_rate_limit
+
+    def __match_tmdbinfo(
+        self,
+        candidates: List[Tuple[str, int | None]],
+        year: str | None,
+        mtype: MediaType | None,
+    ) -> dict[str, Any] | None:
+        """
+        按候选名称匹配TMDB信息，返回优先级最高的匹配结果
+        并发数大于1时同时查询多个名称，靠前的名称未返回前不采用靠后名称的结果
+        :param candidates: 按优先级排列的 (名称, 季数)
+        """
+
+        def __match(name: str, season: int | None) -> dict[str, Any] | None:
             logger.debug(f"match_tmdbinfo name:::{name}")
-            logger.debug(f"match_tmdbinfo mtype:::{__mtype}")
-            logger.debug(f"match_tmdbinfo meta.year:::{meta.year}")
-            logger.debug(f"match_tmdbinfo begin_season:::{__begin_season}")
-            tmdbinfo = self.mediachain.match_tmdbinfo(
+            logger.debug(f"match_tmdbinfo mtype:::{mtype}")
+            logger.debug(f"match_tmdbinfo meta.year:::{year}")
+            logger.debug(f"match_tmdbinfo begin_season:::{season}")
+            return self.mediachain.match_tmdbinfo(
                 name=name,
-                year=meta.year,
-                mtype=__mtype,
-                season=__begin_season,
+                year=year,
+                mtype=mtype,
+                season=season,
             )
-            # logger.debug(f"tmdbinfo:::{tmdbinfo}")
 
-            if tmdbinfo:
-                # 合季季后返回
-                tmdbinfo["season"] = meta.begin_season
-                return tmdbinfo, is_ip_rate_limit
+        if self._match_workers <= 1 or len(candidates) <= 1:
+            for name, season in candidates:
+                tmdbinfo = __match(name, season)
+                if tmdbinfo:
+                    return tmdbinfo
+            return None
 
-        return None, is_ip_rate_limit
+        executor = ThreadPoolExecutor(
+            max_workers=min(self._match_workers, len(candidates)),
+            thread_name_prefix=f"{self._plugin_id}-match",
+        )
+        futures = [
+            executor.submit(__match, name, season)
+            for name, season in candidates
+        ]
+        try:
+            for future in futures:
+                tmdbinfo = future.result()
+                if tmdbinfo:
+                    return tmdbinfo
+            return None
+        finally:
+            # 取消未开始的查询，已开始的查询结果忽略，不等待其结束
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def __douban_info(
         self, doubanid: str, mtype: MediaType | None = None
@@ -2180,40 +4751,85 @@ class DoubanRankPlus(_PluginBase):
         {'msg': 'subject_ip_rate_limit','code': 1309, 'request': 'GET /v2/movie/30483637','localized_message': '您所在的网络存在异常，请登录后重试。'}
         """
 
+        def __douban_detail(detail_func) -> Tuple[dict[str, Any] | None, bool]:
+            """
+            限速获取豆瓣详情，并根据结果调整请求速率和熔断状态
+            """
+            is_allowed, is_probe = self.douban_breaker.allow_request()
+            if not is_allowed:
+                logger.info(f"豆瓣熔断中，跳过获取豆瓣信息：{doubanid}")
+                return None, True
+            try:
+                self.__take_douban_budget()
+                if not self.douban_limiter.acquire(self._event):
+                    return None, False
+                info = detail_func(doubanid)
+                if info:
+                    if "subject_ip_rate_limit" in info.get("msg", ""):
+                        logger.warn(
+                            f"触发豆瓣IP速率限制，错误信息：{info} ..."
+                        )
+                        self.douban_limiter.on_rate_limit()
+                        self.douban_breaker.on_rate_limit()
+                        logger.info(
+                            f"豆瓣请求间隔调整为: {round(self.douban_limiter.interval, 1)} 秒, 熔断至: {self.douban_breaker.open_until}"
+                        )
+                        return None, True
+                self.douban_limiter.on_success()
+                if is_probe:
+                    self.douban_breaker.on_success()
+                return info, False
+            finally:
+                if is_probe:
+                    self.douban_breaker.release()
+
         def __douban_tv() -> Tuple[dict[str, Any] | None, bool]:
             """
             获取豆瓣剧集信息
             """
-            info = self.doubanapi.tv_detail(doubanid)
-            if info:
-                if "subject_ip_rate_limit" in info.get("msg", ""):
-                    logger.warn(f"触发豆瓣IP速率限制，错误信息：{info} ...")
-                    return None, True
-            return info, False
+            return __douban_detail(self.doubanapi.tv_detail)
 
         def __douban_movie() -> Tuple[dict[str, Any] | None, bool]:
             """
             获取豆瓣电影信息
             """
-            info = self.doubanapi.movie_detail(doubanid)
-            if info:
-                if "subject_ip_rate_limit" in info.get("msg", ""):
-                    logger.warn(f"触发豆瓣IP速率限制，错误信息：{info} ...")
-                    return None, True
-            return info, False
+            return __douban_detail(self.doubanapi.movie_detail)
 
         if not doubanid:
             return None, False
+
+        cache = self.douban_cache.get(doubanid)
+        if cache:
+            logger.info(
+                f"使用豆瓣信息缓存：{doubanid}, 来源: {cache.get('endpoint')}"
+            )
+            return cache.get("info"), False
+
         logger.info(f"开始获取豆瓣信息：{doubanid} ...")
         if mtype == MediaType.TV:
-            return __douban_tv()
+            endpoint = "tv"
+            info, is_ip_rate_limit = __douban_tv()
         else:
-            movie_info, is_ip_rate_limit = __douban_movie()
-            if not movie_info and not is_ip_rate_limit:
+            endpoint = "movie"
+            info, is_ip_rate_limit = __douban_movie()
+            if not info and not is_ip_rate_limit:
                 logger.debug("未从电影类型获取到信息，返回从剧集获取信息")
-                return __douban_tv()
-            else:
-                return movie_info, is_ip_rate_limit
+                endpoint = "tv"
+                info, is_ip_rate_limit = __douban_tv()
+
+        if info and info.get("title"):
+            self.douban_cache.set(
+                doubanid,
+                {
+                    "endpoint": endpoint,
+                    "info": {
+                        key: info.get(key)
+                        for key in self._douban_cache_fields
+                        if key in info
+                    },
+                },
+            )
+        return info, is_ip_rate_limit
 
     def __get_migrate_info(self, migrate_url: str):
         """
@@ -2222,7 +4838,9 @@ class DoubanRankPlus(_PluginBase):
         logger.info(f"开始从原MP获取数据，【请求URL】：{migrate_url}")
 
         try:
-            res = RequestUtils().request(method="get", url=migrate_url)
+            res = RequestUtils(session=self._session).request(
+                method="get", url=migrate_url
+            )
             if not res:
                 logger.error(
                     "没有获取到原MP信息，检查原MP地址和API Token是否正确，检查浏览器打开【请求URL】查看是能获取到数据"